@@ -1,29 +1,75 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.conf.urls import url
 from rest_framework.response import Response
 from wagtail.api.v2.router import WagtailAPIRouter
+from wagtail.api.v2.utils import BadRequestError, page_models_from_string
 from wagtail.api.v2.views import PagesAPIViewSet
 from wagtail.images.api.v2.views import ImagesAPIViewSet
 from wagtail.documents.api.v2.views import DocumentsAPIViewSet
 from wagtail.core.models import Page, Site
 
+from .apicache import get_response_cache
+from .drafts import get_latest_revisions_as_pages
+from .pagination import CursorPagination, get_limit
+from .search.results import get_ranked_ids
+from .search.snippets import get_snippets
+
 
 class DraftPagesAPIViewSet(PagesAPIViewSet):
     known_query_parameters = \
-        PagesAPIViewSet.known_query_parameters.union(['draft'])
+        PagesAPIViewSet.known_query_parameters.union(['draft', 'cursor'])
 
     def include_draft(self):
         return self.request.GET.get('draft')
 
+    @property
+    def paginator(self):
+        if 'cursor' not in self.request.GET:
+            return super(DraftPagesAPIViewSet, self).paginator
+        if not hasattr(self, '_paginator'):
+            self._paginator = CursorPagination()
+        return self._paginator
+
+    def dispatch(self, request, *args, **kwargs):
+        dispatch = super(DraftPagesAPIViewSet, self).dispatch
+        return get_response_cache().get_or_render(
+            request, type(self).__name__, lambda: dispatch(request, *args, **kwargs))
+
     def get_base_queryset(self):
-        if not self.include_draft():
-            return super(DraftPagesAPIViewSet, self).get_base_queryset()
+        return self.get_typed_queryset(Page)
+
+    def get_typed_queryset(self, model):
+        """
+        Return the pages of type ``model`` that can be seen by this user, as
+        instances of ``model``.
+
+        This filters on the site root's path prefix and the page's content
+        type directly, instead of joining ``model`` against an ``id__in``
+        subquery of the base queryset.
+        """
+        queryset = model.objects.all()
+        if model is not Page:
+            queryset = queryset.type(model)
 
         site = Site.find_for_request(self.request)
+        if not (site and self.include_draft()):
+            # Get live pages that are not in a private section
+            queryset = queryset.public().live()
         if not site:
-            return super(DraftPagesAPIViewSet, self).get_base_queryset()
+            # No sites configured
+            return queryset.none()
+        return queryset.descendant_of(site.root_page, inclusive=True)
 
-        queryset = Page.objects.all()
-        queryset = queryset.descendant_of(site.root_page, inclusive=True)
-        return queryset
+    def get_queryset(self):
+        try:
+            models = page_models_from_string(self.request.GET.get('type', 'wagtailcore.Page'))
+        except (LookupError, ValueError):
+            raise BadRequestError("type doesn't exist")
+        if len(models) == 1:
+            return self.get_typed_queryset(models[0])
+        return super(DraftPagesAPIViewSet, self).get_queryset()
 
     def listing_view(self, request):
         if not self.include_draft():
@@ -33,8 +79,7 @@ class DraftPagesAPIViewSet(PagesAPIViewSet):
         self.check_query_parameters(queryset)
         queryset = self.filter_queryset(queryset)
         queryset = self.paginate_queryset(queryset)
-        instances = [instance.get_latest_revision_as_page()
-                     for instance in queryset]
+        instances = get_latest_revisions_as_pages(list(queryset))
         serializer = self.get_serializer(instances, many=True)
         return self.get_paginated_response(serializer.data)
 
@@ -46,14 +91,137 @@ class DraftPagesAPIViewSet(PagesAPIViewSet):
         return Response(serializer.data)
 
 
+class PagesByIdAPIViewSet(DraftPagesAPIViewSet):
+    """
+    Several pages, given by id, in one response.
+
+    ``?ids=3,5,9`` returns those of the pages that can be seen, in the order
+    of ``ids``, serialized as in the pages listing. ``draft``, ``fields``,
+    ``type`` and the tree filters work as they do there; the number of
+    queries doesn't depend on the number of ids.
+    """
+    known_query_parameters = frozenset([
+        'ids',
+        'fields',
+        'type',
+        'child_of',
+        'descendant_of',
+        'draft',
+        '_',
+    ])
+
+    def get_ids(self):
+        limit_max = getattr(settings, 'WAGTAILAPI_LIMIT_MAX', 20)
+        try:
+            ids = [int(pk) for pk in self.request.GET['ids'].split(',')]
+            if any(pk < 1 for pk in ids):
+                raise ValueError()
+        except (KeyError, ValueError):
+            raise BadRequestError("ids must be a comma-separated list of page ids")
+        ids = list(OrderedDict.fromkeys(ids))
+        if limit_max and len(ids) > limit_max:
+            raise BadRequestError(
+                "ids cannot list more than %d pages" % limit_max)
+        return ids
+
+    def listing_view(self, request):
+        ids = self.get_ids()
+        queryset = self.get_queryset()
+        self.check_query_parameters(queryset)
+        queryset = self.filter_queryset(queryset).filter(id__in=ids)
+        pages = {page.pk: page for page in queryset}
+        instances = [pages[pk] for pk in ids if pk in pages]
+        if self.include_draft():
+            instances = get_latest_revisions_as_pages(instances)
+        serializer = self.get_serializer(instances, many=True)
+        return Response(OrderedDict([
+            ('meta', OrderedDict([
+                ('total_count', len(instances)),
+            ])),
+            ('items', serializer.data),
+        ]))
+
+    @classmethod
+    def get_urlpatterns(cls):
+        return [
+            url(r'^$', cls.as_view({'get': 'listing_view'}), name='listing'),
+        ]
+
+
+class SearchAPIViewSet(DraftPagesAPIViewSet):
+    """
+    Pages matching ``?query=``, by rank.
+
+    Items are serialized as in the pages listing, with ``fields``, and
+    carry a highlighted ``snippet`` of the page's text (HTML), taken from
+    the draft with ``draft=1``. Pages are walked with ``cursor``: empty or
+    absent for the first page, then the ``next_cursor`` of the previous
+    one. Unlike the pages listing, the cursor is an offset into the ranked
+    results, so a page published or unpublished between two requests may
+    shift later pages by a few results. Ranked ids are cached (see
+    ``backend_site.search.results``) and responses go through the same
+    cache as the pages endpoints.
+    """
+    known_query_parameters = frozenset([
+        'query',
+        'fields',
+        'limit',
+        'cursor',
+        'draft',
+        '_',
+    ])
+
+    def get_cursor(self):
+        cursor = self.request.GET.get('cursor', '')
+        if not cursor:
+            return 0
+        try:
+            start = int(cursor)
+            if start < 0:
+                raise ValueError()
+        except ValueError:
+            raise BadRequestError("cursor is not valid")
+        return start
+
+    def listing_view(self, request):
+        query_string = request.GET.get('query', '')
+        limit = get_limit(request)
+        start = self.get_cursor()
+        stop = start + limit
+
+        queryset = self.get_queryset()
+        self.check_query_parameters(queryset)
+        # One more id tells whether there is a next page.
+        ids = get_ranked_ids(query_string, stop + 1)[0] if query_string.strip() else []
+        pages = {page.pk: page for page in self.filter_queryset(queryset).filter(id__in=ids[start:stop])}
+        instances = [pages[pk] for pk in ids[start:stop] if pk in pages]
+        if self.include_draft():
+            instances = get_latest_revisions_as_pages(instances)
+        snippets = get_snippets(instances, query_string)
+
+        items = self.get_serializer(instances, many=True).data
+        for item, snippet in zip(items, snippets):
+            item['snippet'] = snippet
+        return Response(OrderedDict([
+            ('meta', OrderedDict([
+                ('next_cursor', str(stop) if len(ids) > stop else None),
+            ])),
+            ('items', items),
+        ]))
+
+    @classmethod
+    def get_urlpatterns(cls):
+        return [
+            url(r'^$', cls.as_view({'get': 'listing_view'}), name='listing'),
+        ]
+
+
 class DraftBlogPagesAPIViewSet(DraftPagesAPIViewSet):
     listing_default_fields = ['id', 'type', 'detail_url', 'body']
 
     def get_queryset(self):
         from backend_site.blog.models import BlogPage
-        return BlogPage.objects.filter(
-            id__in=self.get_base_queryset().values_list('id', flat=True)
-        )
+        return self.get_typed_queryset(BlogPage)
 
 
 # Create the router. "wagtailapi" is the URL namespace
@@ -67,3 +235,5 @@ api_router.register_endpoint('pages', DraftPagesAPIViewSet)
 api_router.register_endpoint('images', ImagesAPIViewSet)
 api_router.register_endpoint('documents', DocumentsAPIViewSet)
 api_router.register_endpoint('blogs', DraftBlogPagesAPIViewSet)
+api_router.register_endpoint('pages-by-id', PagesByIdAPIViewSet)
+api_router.register_endpoint('search', SearchAPIViewSet)
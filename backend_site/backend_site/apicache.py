@@ -0,0 +1,197 @@
+"""
+Cache of rendered API responses.
+
+Successful responses of the pages endpoints are stored as JSON bytes in a
+Django cache, so a hit is answered without touching the ORM or the
+serializers. Keys are made of the endpoint, the host, the path, the sorted
+query parameters and the content version. The content version changes
+whenever published pages, their view restrictions or sites change (see
+``backend_site.changes``), which makes every older entry unreachable.
+Draft requests are never cached.
+
+Cacheable responses carry an ``ETag`` derived from their key and a
+``Last-Modified`` date, the time the content version last changed. Requests
+for a response that is in the cache get a 304 if their ``If-None-Match`` or
+``If-Modified-Since`` still match it. Only successful responses are cached,
+so errors and responses that were never built are not validated.
+
+Options are read from ``settings.API_RESPONSE_CACHE``:
+
+``ENABLED``
+    Set to ``False`` to always build responses.
+``TIMEOUT``
+    Lifetime of entries in seconds.
+``CACHE_ALIAS``
+    Django cache holding the responses.
+``VERSION_CACHE_ALIAS``
+    Django cache holding the content version, ``CACHE_ALIAS`` if ``None``.
+    It must be shared by every process that changes or serves pages, or a
+    change made in one of them would go unnoticed by the others.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TIMEOUT': 300,
+    'CACHE_ALIAS': 'default',
+    'VERSION_CACHE_ALIAS': None,
+}
+
+CONTENT_VERSION_KEY = 'apicache:content-version'
+
+
+class CachedResponse(object):
+    __slots__ = ('content_type', 'content')
+
+    def __init__(self, content_type, content):
+        self.content_type = content_type
+        self.content = content
+
+    def __getstate__(self):
+        return (self.content_type, self.content)
+
+    def __setstate__(self, state):
+        self.content_type, self.content = state
+
+    def to_response(self):
+        return HttpResponse(self.content, content_type=self.content_type)
+
+
+class ResponseCache(object):
+    key_prefix = 'apicache'
+
+    def __init__(self, options=None):
+        self.options = dict(DEFAULTS, **(options or {}))
+
+    @property
+    def cache(self):
+        return caches[self.options['CACHE_ALIAS']]
+
+    @property
+    def version_cache(self):
+        return caches[self.options['VERSION_CACHE_ALIAS'] or self.options['CACHE_ALIAS']]
+
+    def get_content_version(self):
+        """
+        Return the content version, ``'<timestamp>-<token>'``.
+        """
+        cache = self.version_cache
+        version = cache.get(CONTENT_VERSION_KEY)
+        if version is None:
+            cache.add(CONTENT_VERSION_KEY, self.make_content_version(), timeout=None)
+            version = cache.get(CONTENT_VERSION_KEY)
+        return version
+
+    def bump_content_version(self):
+        cache = self.version_cache
+        previous = cache.get(CONTENT_VERSION_KEY)
+        cache.set(CONTENT_VERSION_KEY, self.make_content_version(previous), timeout=None)
+
+    def make_content_version(self, previous=None):
+        timestamp = int(time.time())
+        if previous is not None:
+            # Last-Modified has a resolution of one second; never reuse it.
+            timestamp = max(timestamp, get_timestamp(previous) + 1)
+        return f'{timestamp}-{uuid.uuid4().hex}'
+
+    def is_cacheable(self, request):
+        return (
+            self.options['ENABLED']
+            and request.method in ('GET', 'HEAD')
+            and not request.GET.get('draft')
+        )
+
+    def make_key(self, request, endpoint, version=None):
+        if version is None:
+            version = self.get_content_version()
+        params = urlencode(sorted(request.GET.lists()), doseq=True)
+        source = f'{version}:{endpoint}:{request.get_host()}:{request.path}?{params}'
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        return f'{self.key_prefix}:{digest}'
+
+    def set_validators(self, response, key, version):
+        response['ETag'] = quote_etag(key.rpartition(':')[2])
+        response['Last-Modified'] = http_date(get_timestamp(version))
+        return response
+
+    def get_or_render(self, request, endpoint, render):
+        """
+        Return the cached response for ``request``, or a 304 if the client's
+        copy of it is current, or call ``render()`` to build it and cache it
+        if it was successful.
+        """
+        if not self.is_cacheable(request):
+            return render()
+        version = self.get_content_version()
+        key = self.make_key(request, endpoint, version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            response = self.set_validators(cached.to_response(), key, version)
+            return get_conditional_response(
+                request, etag=response['ETag'], last_modified=get_timestamp(version), response=response)
+        response = render()
+        if response.status_code == 200 and not response.streaming:
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            self.cache.set(
+                key, CachedResponse(response['Content-Type'], response.content),
+                timeout=self.options['TIMEOUT'])
+            self.set_validators(response, key, version)
+        return response
+
+
+def get_timestamp(version):
+    return int(version.partition('-')[0])
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(getattr(settings, 'API_RESPONSE_CACHE', None))
+    return _response_cache
+
+
+@receiver(setting_changed)
+def reset_response_cache(setting, **kwargs):
+    global _response_cache
+    if setting == 'API_RESPONSE_CACHE':
+        with _response_cache_lock:
+            _response_cache = None
+
+
+def get_content_version():
+    """
+    Return a token that changes whenever published pages change, for other
+    caches of published content.
+    """
+    return get_response_cache().get_content_version()
+
+
+def invalidate_responses():
+    """
+    Make every cached response unreachable, now and once the current
+    transaction is committed (requests made in between may have cached
+    the old content again).
+    """
+    response_cache = get_response_cache()
+    response_cache.bump_content_version()
+    transaction.on_commit(response_cache.bump_content_version)
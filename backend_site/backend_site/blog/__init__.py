@@ -0,0 +1 @@
+default_app_config = 'backend_site.blog.apps.BlogAppConfig'
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class BlogAppConfig(AppConfig):
+    name = 'backend_site.blog'
+    label = 'blog'
+    verbose_name = 'Blog'
+
+    def ready(self):
+        from .signal_handlers import register_signal_handlers
+        register_signal_handlers()
@@ -0,0 +1,80 @@
+import time
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+
+from wagtail.core.models import Page, Site
+
+from .benchtyped import add_pages
+
+
+class Command(BaseCommand):
+    help = 'Compare offset and cursor pagination of the pages listing in a large page tree.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=100000,
+            help='Number of plain pages to add to the tree.',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=100,
+            help='Number of pages per request.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Number of runs; the best one is reported.',
+        )
+        parser.add_argument(
+            '--walk', action='store_true',
+            help='Also page through the whole listing in both modes.',
+        )
+
+    def handle(self, *args, **options):
+        site = Site.objects.filter(is_default_site=True).first()
+        if site is None:
+            raise CommandError('There is no default site.')
+        with transaction.atomic():
+            add_pages(site.root_page, options['pages'])
+            settings = {'API_RESPONSE_CACHE': {'ENABLED': False}, 'WAGTAILAPI_LIMIT_MAX': options['limit']}
+            with override_settings(**settings):
+                self.run(site, options)
+            transaction.set_rollback(True)
+
+    def run(self, site, options):
+        client = Client(HTTP_HOST=site.hostname)
+        limit = options['limit']
+        ids = list(Page.objects.live().descendant_of(site.root_page, inclusive=True)
+                   .order_by('id').values_list('id', flat=True))
+        self.stdout.write(f'/api/v1/pages/, {len(ids)} pages, {limit} per request')
+
+        for draft in ({}, {'draft': '1'}):
+            for position in (0, len(ids) // 10, len(ids) // 2, len(ids) - limit):
+                params = {'limit': limit, 'offset': position}
+                cursor = {'limit': limit, 'cursor': ids[position - 1] if position else ''}
+                timings = []
+                for variant in (params, cursor):
+                    variant = dict(variant, **draft)
+                    timings.append(min(timeit.repeat(
+                        lambda: client.get('/api/v1/pages/', variant), number=1, repeat=options['repeat'])))
+                label = f"{'draft' if draft else 'live'} at {position}"
+                self.stdout.write(
+                    f'  {label:<18} offset {timings[0] * 1000:8.1f} ms, cursor {timings[1] * 1000:8.1f} ms')
+
+        if options['walk']:
+            for name, first, get_next in [
+                ('offset', {'offset': 0}, lambda params, data: (
+                    {'offset': params['offset'] + limit} if data['items'] else None)),
+                ('cursor', {'cursor': ''}, lambda params, data: (
+                    {'cursor': data['meta']['next_cursor']} if data['meta']['next_cursor'] else None)),
+            ]:
+                start = time.perf_counter()
+                params = first
+                requests = 0
+                while params is not None:
+                    data = client.get('/api/v1/pages/', dict(params, limit=limit)).json()
+                    requests += 1
+                    params = get_next(params, data)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f'  walk with {name}: {requests} requests, {elapsed:.1f} s')
@@ -0,0 +1,62 @@
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+
+from backend_site.blog.models import BlogIndexPage, BlogPage
+
+LOREM = (
+    'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod '
+    'tempor incididunt ut labore et dolore magna aliqua. '
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare payload size and response time of the blogs listing for several fields parameters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=20,
+            help='Number of blog pages to create.',
+        )
+        parser.add_argument(
+            '--body-size', type=int, default=5000,
+            help='Length of the body of each page.',
+        )
+        parser.add_argument(
+            '--fields', action='append',
+            help='Value of the fields parameter to compare; may be repeated.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Number of runs; the best one is reported.',
+        )
+
+    def handle(self, *args, **options):
+        variants = options['fields'] or ['*', None, '_,date_published,id,title']
+        index = BlogIndexPage.objects.first()
+        if index is None:
+            raise CommandError('There is no blog index page.')
+        body = (LOREM * (options['body_size'] // len(LOREM) + 1))[:options['body_size']]
+        with transaction.atomic():
+            for i in range(options['pages']):
+                index.add_child(instance=BlogPage(title=f'Benchmark {i}', body=body))
+            self.run(variants, options)
+            transaction.set_rollback(True)
+
+    def run(self, variants, options):
+        client = Client(HTTP_HOST='localhost')
+        self.stdout.write(f"/api/v1/blogs/, {options['pages']} new pages with a {options['body_size']} character body")
+        for fields in variants:
+            params = {'limit': options['pages']}
+            if fields is not None:
+                params['fields'] = fields
+            response = client.get('/api/v1/blogs/', params)
+            if response.status_code != 200:
+                raise CommandError(f'fields={fields}: {response.status_code} {response.content[:200]}')
+            best = min(timeit.repeat(
+                lambda: client.get('/api/v1/blogs/', params), number=1, repeat=options['repeat']))
+            label = 'default' if fields is None else f'fields={fields}'
+            self.stdout.write(
+                f'  {label:<36} {len(response.content):10d} bytes, {best * 1000:8.1f} ms/request')
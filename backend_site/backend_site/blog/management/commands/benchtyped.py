@@ -0,0 +1,86 @@
+import timeit
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+
+from wagtail.core.models import Page
+
+from backend_site.api import DraftBlogPagesAPIViewSet
+from backend_site.blog.models import BlogIndexPage, BlogPage
+
+
+def add_pages(parent, count):
+    """
+    Add ``count`` plain pages in a new folder under ``parent``.
+    """
+    # add_child() would take one save per page; build the tree directly.
+    content_type = ContentType.objects.get_for_model(Page)
+    folder = parent.add_child(instance=Page(title='Benchmark pages', slug='benchmark-pages'))
+    pages = []
+    for i in range(count):
+        pages.append(Page(
+            path=Page._get_path(folder.path, folder.depth + 1, i + 1),
+            depth=folder.depth + 1,
+            numchild=0,
+            title=f'Page {i}',
+            draft_title=f'Page {i}',
+            slug=f'page-{i}',
+            url_path=f'{folder.url_path}page-{i}/',
+            content_type=content_type,
+            live=True,
+        ))
+    Page.objects.bulk_create(pages)
+    Page.objects.filter(pk=folder.pk).update(numchild=count)
+
+
+class Command(BaseCommand):
+    help = 'Compare the typed blogs queryset with the id__in subquery it replaced, in a large page tree.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=100000,
+            help='Number of plain pages to add to the tree.',
+        )
+        parser.add_argument(
+            '--blog-pages', type=int, default=200,
+            help='Number of blog pages to add to the blog index.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Number of runs; the best one is reported.',
+        )
+
+    def handle(self, *args, **options):
+        index = BlogIndexPage.objects.first()
+        if index is None:
+            raise CommandError('There is no blog index page.')
+        with transaction.atomic():
+            add_pages(index.get_parent(), options['pages'])
+            for i in range(options['blog_pages']):
+                index.add_child(instance=BlogPage(title=f'Benchmark {i}', slug=f'benchmark-{i}'))
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        self.stdout.write(
+            f"{Page.objects.count()} pages, {BlogPage.objects.count()} blog pages")
+        for draft in (False, True):
+            params = {'draft': '1'} if draft else {}
+            view = DraftBlogPagesAPIViewSet()
+            view.request = RequestFactory().get('/api/v1/blogs/', params, HTTP_HOST='localhost')
+            variants = [
+                ('id__in subquery', lambda: BlogPage.objects.filter(
+                    id__in=view.get_base_queryset().values_list('id', flat=True))),
+                ('typed', view.get_queryset),
+            ]
+            for name, get_queryset in variants:
+                # The listing counts the results and loads the first page.
+                def listing():
+                    queryset = get_queryset()
+                    queryset.count()
+                    list(queryset[:20])
+                best = min(timeit.repeat(listing, number=1, repeat=options['repeat']))
+                label = f"{'draft' if draft else 'live'} {name}"
+                self.stdout.write(f'  {label:<24} {best * 1000:8.1f} ms')
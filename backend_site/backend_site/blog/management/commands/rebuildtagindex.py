@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from backend_site.blog import tag_index
+from backend_site.blog.models import BlogTagIndexEntry
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the tag index of the blog from the page tree.'
+
+    def handle(self, *args, **options):
+        tag_index.rebuild()
+        self.stdout.write(f'{BlogTagIndexEntry.objects.count()} tag index entries')
@@ -0,0 +1,48 @@
+# Generated by Django 3.0.10 on 2026-10-17 18:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_tag_index(apps, schema_editor):
+    BlogIndexPage = apps.get_model('blog', 'BlogIndexPage')
+    BlogPage = apps.get_model('blog', 'BlogPage')
+    BlogPageTag = apps.get_model('blog', 'BlogPageTag')
+    BlogTagIndexEntry = apps.get_model('blog', 'BlogTagIndexEntry')
+    steplen = 4
+
+    index_ids = dict(BlogIndexPage.objects.values_list('path', 'pk'))
+    post_paths = dict(BlogPage.objects.filter(live=True).values_list('pk', 'path'))
+    entries = []
+    for post_id, tag_id in BlogPageTag.objects.values_list('content_object_id', 'tag_id'):
+        path = post_paths.get(post_id)
+        if path is None:
+            continue
+        for end in range(steplen, len(path), steplen):
+            if path[:end] in index_ids:
+                entries.append(BlogTagIndexEntry(index_id=index_ids[path[:end]], tag_id=tag_id, post_id=post_id))
+    BlogTagIndexEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taggit', '0003_taggeditem_add_unique_index'),
+        ('blog', '0003_auto_20170329_0055'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogTagIndexEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_index_entries', to='blog.BlogIndexPage')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_index_entries', to='blog.BlogPage')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blog_tag_index_entries', to='taggit.Tag')),
+            ],
+            options={
+                'unique_together': {('index', 'tag', 'post')},
+            },
+        ),
+        migrations.RunPython(fill_tag_index, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 
 from django.contrib import messages
+from django.core.cache import cache
 from django.db import models
 from django.shortcuts import redirect, render
 
@@ -18,6 +19,19 @@ from wagtail.core.models import Page
 from wagtail.images.edit_handlers import ImageChooserPanel
 from wagtail.search import index
 
+from backend_site.apicache import get_content_version
+
+# How long the tags of a blog index are cached, at most; publishing any
+# page makes the cached tags unreachable before that.
+CHILD_TAGS_TIMEOUT = 3600
+
+
+def get_tag_url_prefix(index_page):
+    """
+    Return the URL of the tag archive of ``index_page``, to add tag slugs to.
+    """
+    return '/' + '/'.join([index_page.url.strip('/'), 'tags', ''])
+
 
 class BlogPageTag(TaggedItemBase):
     """
@@ -87,13 +101,10 @@ class BlogPage(Page):
         are related to the blog post into a list we can access on the template.
         We're additionally adding a URL to access BlogPage objects with that tag
         """
-        tags = self.tags.all()
+        tags = [tagged_item.tag for tagged_item in self.tagged_items.select_related('tag')]
+        url_prefix = get_tag_url_prefix(self.get_parent())
         for tag in tags:
-            tag.url = '/' + '/'.join(s.strip('/') for s in [
-                self.get_parent().url,
-                'tags',
-                tag.slug
-            ])
+            tag.url = url_prefix + tag.slug
         return tags
 
     # Specifies parent to BlogPage as being BlogIndexPages
@@ -125,6 +136,10 @@ class BlogIndexPage(RoutablePageMixin, Page):
         help_text='Landscape mode only; horizontal width between 1000px and 3000px.'
     )
 
+    api_fields = [
+        'tag_index',
+    ]
+
     content_panels = Page.content_panels + [
         FieldPanel('introduction', classname="full"),
         ImageChooserPanel('image'),
@@ -178,16 +193,46 @@ class BlogIndexPage(RoutablePageMixin, Page):
     # Returns the child BlogPage objects for this BlogPageIndex.
     # If a tag is used then it will filter the posts by tag.
     def get_posts(self, tag=None):
-        posts = BlogPage.objects.live().descendant_of(self)
         if tag:
-            posts = posts.filter(tags=tag)
-        return posts
+            # Read from the tag index rather than the tree.
+            return BlogPage.objects.live().filter(
+                tag_index_entries__index=self, tag_index_entries__tag=tag)
+        return BlogPage.objects.live().descendant_of(self)
 
     # Returns the list of Tags for all child posts of this BlogPage.
+    # They are read from the tag index and cached until a page is published.
     def get_child_tags(self):
-        tags = []
-        for post in self.get_posts():
-            # Not tags.append() because we don't want a list of lists
-            tags += post.get_tags
-        tags = sorted(set(tags))
+        key = f'blog:child-tags:{self.pk}:{get_content_version()}'
+        tags = cache.get(key)
+        if tags is None:
+            tags = sorted(Tag.objects.filter(blog_tag_index_entries__index=self).distinct())
+            url_prefix = get_tag_url_prefix(self)
+            for tag in tags:
+                tag.url = url_prefix + tag.slug
+            cache.set(key, tags, timeout=CHILD_TAGS_TIMEOUT)
         return tags
+
+    @property
+    def tag_index(self):
+        """
+        Every tag of the live posts below this index, by name, with the ids of
+        the posts tagged with it.
+        """
+        tags = {}
+        for slug, name, post_id in self.tag_index_entries.order_by('post_id').values_list(
+                'tag__slug', 'tag__name', 'post_id'):
+            tags.setdefault(slug, {'name': name, 'slug': slug, 'posts': []})['posts'].append(post_id)
+        return sorted(tags.values(), key=lambda tag: tag['name'].lower())
+
+
+class BlogTagIndexEntry(models.Model):
+    """
+    A live blog post filed under one of its tags in a blog index above it.
+    These rows are maintained by ``backend_site.blog.tag_index``.
+    """
+    index = models.ForeignKey(BlogIndexPage, on_delete=models.CASCADE, related_name='tag_index_entries')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='blog_tag_index_entries')
+    post = models.ForeignKey(BlogPage, on_delete=models.CASCADE, related_name='tag_index_entries')
+
+    class Meta:
+        unique_together = [('index', 'tag', 'post')]
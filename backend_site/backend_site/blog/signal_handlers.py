@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+
+from wagtail.core.models import Page
+
+from . import tag_index
+from .models import BlogPageTag
+
+
+def post_save_page_handler(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    # Full saves of existing pages cover publishing, unpublishing and moves;
+    # tags are committed after the page itself and handled below.
+    if raw or created or update_fields is not None:
+        return
+    if isinstance(instance, Page):
+        tag_index.sync_page(instance)
+
+
+def post_save_tag_handler(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    tag_index.add_tag(instance.content_object, instance.tag_id)
+
+
+def post_delete_tag_handler(sender, instance, **kwargs):
+    tag_index.remove_tag(instance.content_object_id, instance.tag_id)
+
+
+def register_signal_handlers():
+    post_save.connect(post_save_page_handler)
+    post_save.connect(post_save_tag_handler, sender=BlogPageTag)
+    post_delete.connect(post_delete_tag_handler, sender=BlogPageTag)
@@ -0,0 +1,90 @@
+"""
+Maintain the tag index of the blog.
+
+``BlogTagIndexEntry`` rows file every live blog post under each of its tags,
+for every blog index above it, so tag archives and tag clouds are read from
+one indexed table instead of scanning the page tree and joining through
+taggit. The rows are kept up to date from the signal handlers of this app:
+tags committed or removed on a live post add or remove their entries, and
+full saves of pages (publishing, unpublishing, moves) bring the entries of
+the posts at or below the page in line with the tree.
+"""
+from wagtail.core.models import Page
+
+from .models import BlogIndexPage, BlogPage, BlogPageTag, BlogTagIndexEntry
+
+
+def get_ancestor_paths(path):
+    return [path[:end] for end in range(Page.steplen, len(path), Page.steplen)]
+
+
+def get_index_ids(path):
+    """
+    Return the ids of the blog indexes above the page at ``path``.
+    """
+    return list(BlogIndexPage.objects.filter(
+        path__in=get_ancestor_paths(path)).values_list('pk', flat=True))
+
+
+def add_tag(post, tag_id):
+    if not post.live:
+        return
+    BlogTagIndexEntry.objects.bulk_create([
+        BlogTagIndexEntry(index_id=index_id, tag_id=tag_id, post_id=post.pk)
+        for index_id in get_index_ids(post.path)
+    ], ignore_conflicts=True)
+
+
+def remove_tag(post_id, tag_id):
+    BlogTagIndexEntry.objects.filter(post_id=post_id, tag_id=tag_id).delete()
+
+
+def sync_posts(posts):
+    """
+    Bring the entries of ``posts``, a queryset of blog pages, in line with
+    their tags, their liveness and their place in the tree, only writing
+    the entries that changed.
+    """
+    live_paths = dict(posts.filter(live=True).values_list('pk', 'path'))
+    ancestor_paths = {
+        ancestor_path for path in live_paths.values() for ancestor_path in get_ancestor_paths(path)}
+    index_ids = dict(BlogIndexPage.objects.filter(path__in=ancestor_paths).values_list('path', 'pk'))
+    tag_ids = {}
+    for post_id, tag_id in BlogPageTag.objects.filter(
+            content_object__in=posts.filter(live=True)).values_list('content_object_id', 'tag_id'):
+        tag_ids.setdefault(post_id, []).append(tag_id)
+
+    wanted = {
+        (index_ids[ancestor_path], tag_id, post_id)
+        for post_id, path in live_paths.items()
+        for ancestor_path in get_ancestor_paths(path) if ancestor_path in index_ids
+        for tag_id in tag_ids.get(post_id, ())
+    }
+    existing = {
+        (index_id, tag_id, post_id): pk
+        for pk, index_id, tag_id, post_id in BlogTagIndexEntry.objects.filter(
+            post__in=posts).values_list('pk', 'index_id', 'tag_id', 'post_id')
+    }
+    stale = [pk for key, pk in existing.items() if key not in wanted]
+    if stale:
+        BlogTagIndexEntry.objects.filter(pk__in=stale).delete()
+    BlogTagIndexEntry.objects.bulk_create([
+        BlogTagIndexEntry(index_id=index_id, tag_id=tag_id, post_id=post_id)
+        for index_id, tag_id, post_id in wanted.difference(existing)
+    ])
+
+
+def sync_page(page):
+    """
+    Bring the entries of the blog posts at or below ``page`` up to date.
+    """
+    # Moves save a plain Page, so look at the class of the content type.
+    if page.numchild or issubclass(page.specific_class or Page, BlogPage):
+        sync_posts(BlogPage.objects.descendant_of(page, inclusive=True))
+
+
+def rebuild():
+    """
+    Rebuild the entries of every blog post.
+    """
+    sync_posts(BlogPage.objects.all())
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ChangesAppConfig(AppConfig):
+    name = 'backend_site.changes'
+    label = 'changes'
+    verbose_name = 'Change notifications'
+
+    def ready(self):
+        from .signal_handlers import register_signal_handlers
+        register_signal_handlers()
@@ -0,0 +1,87 @@
+"""
+Tell the frontends that pages changed.
+
+Events are collected for the current transaction and sent once it is
+committed (straight away outside of a transaction), as a JSON POST to every
+URL in ``settings.CHANGE_WEBHOOKS``. Each request carries
+``settings.CHANGE_WEBHOOK_TOKEN`` in the ``X-Invalidation-Token`` header.
+The requests are made one batch after the other by a background thread, so
+a slow frontend (up to ``settings.CHANGE_WEBHOOK_TIMEOUT`` seconds per URL)
+doesn't hold up the request that changed the pages.
+
+Changes to published pages also invalidate the backend's own cache of API
+responses (see ``backend_site.apicache``).
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+import requests
+
+from backend_site.apicache import invalidate_responses
+
+logger = logging.getLogger(__name__)
+
+_pending = threading.local()
+
+
+def page_changed(event, page, draft=False):
+    if not draft:
+        invalidate_responses()
+    # Events of a transaction that was rolled back are dropped along with
+    # its flush; start over if there is no flush waiting for this one.
+    waiting = getattr(_pending, 'events', None) is not None and is_flush_waiting()
+    if not waiting:
+        _pending.events = {}
+    _pending.events.setdefault((event, page.pk), {
+        'event': event,
+        'page_id': page.pk,
+        'url_path': page.url_path,
+        'draft': draft,
+    })
+    if not waiting:
+        # Runs straight away outside of a transaction.
+        transaction.on_commit(flush)
+
+
+def is_flush_waiting():
+    connection = transaction.get_connection()
+    return connection.in_atomic_block and any(func is flush for sids, func in connection.run_on_commit)
+
+
+def flush():
+    events = getattr(_pending, 'events', None)
+    _pending.events = None
+    if events and getattr(settings, 'CHANGE_WEBHOOKS', []):
+        get_executor().submit(send, list(events.values()))
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor, _executor_pid
+    # A forked worker does not inherit the thread of its parent.
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='change-webhooks')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def send(events):
+    payload = {'events': events}
+    headers = {'X-Invalidation-Token': getattr(settings, 'CHANGE_WEBHOOK_TOKEN', '')}
+    timeout = getattr(settings, 'CHANGE_WEBHOOK_TIMEOUT', 2)
+    for url in getattr(settings, 'CHANGE_WEBHOOKS', []):
+        try:
+            r = requests.post(url, json=payload, headers=headers, timeout=timeout)
+            r.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning('Failed to notify %s of page changes: %s', url, e)
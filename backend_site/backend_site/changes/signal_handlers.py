@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save
+
+from wagtail.core.models import Page, PageRevision, PageViewRestriction, Site
+from wagtail.core.signals import page_published, page_unpublished
+
+from .notify import page_changed
+
+
+def page_published_handler(sender, instance, **kwargs):
+    page_changed('page_published', instance)
+
+
+def page_unpublished_handler(sender, instance, **kwargs):
+    page_changed('page_unpublished', instance)
+
+
+def post_save_page_handler(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    # Full saves of existing pages cover moves and publishing; drafts only
+    # update a few fields, and new pages are not live until published.
+    if raw or created or update_fields is not None:
+        return
+    if isinstance(instance, Page):
+        page_changed('page_changed', instance)
+
+
+def post_delete_page_handler(sender, instance, **kwargs):
+    page_changed('page_deleted', instance)
+
+
+def post_save_revision_handler(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    page_changed('revision_saved', instance.page, draft=True)
+
+
+def post_save_restriction_handler(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    page_changed('restriction_changed', instance.page)
+
+
+def post_delete_restriction_handler(sender, instance, **kwargs):
+    page_changed('restriction_changed', instance.page)
+
+
+def site_changed_handler(sender, instance, raw=False, **kwargs):
+    # Hostnames and root pages appear in URLs and decide what can be seen.
+    if raw:
+        return
+    page_changed('site_changed', instance.root_page)
+
+
+def register_signal_handlers():
+    page_published.connect(page_published_handler)
+    page_unpublished.connect(page_unpublished_handler)
+    post_save.connect(post_save_page_handler)
+    post_delete.connect(post_delete_page_handler, sender=Page)
+    post_save.connect(post_save_revision_handler, sender=PageRevision)
+    post_save.connect(post_save_restriction_handler, sender=PageViewRestriction)
+    post_delete.connect(post_delete_restriction_handler, sender=PageViewRestriction)
+    post_save.connect(site_changed_handler, sender=Site)
+    post_delete.connect(site_changed_handler, sender=Site)
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from wagtail.api.v2.utils import BadRequestError
+
+
+def get_limit(request):
+    """
+    Return the ``limit`` parameter, checked the way Wagtail's listings do.
+    """
+    limit_max = getattr(settings, 'WAGTAILAPI_LIMIT_MAX', 20)
+    try:
+        limit_default = 20 if not limit_max else min(20, limit_max)
+        limit = int(request.GET.get('limit', limit_default))
+        if limit < 1:
+            raise ValueError()
+    except ValueError:
+        raise BadRequestError("limit must be a positive integer")
+
+    if limit_max and limit > limit_max:
+        raise BadRequestError(
+            "limit cannot be higher than %d" % limit_max)
+    return limit
+
+
+class CursorPagination(BasePagination):
+    """
+    Keyset pagination for clients that walk whole listings.
+
+    It is selected with the ``cursor`` parameter: empty for the first page,
+    then the ``next_cursor`` given in the meta of the previous one (``null``
+    on the last page). Items are ordered by id and each page starts after
+    the last id of the previous one, so a page deep into the listing costs
+    no more than the first and the total is never counted.
+    """
+    ordering = 'id'
+    exclusive_parameters = ['offset', 'order', 'search']
+
+    def paginate_queryset(self, queryset, request, view=None):
+        for name in self.exclusive_parameters:
+            if name in request.GET:
+                raise BadRequestError("%s cannot be used with cursor" % name)
+
+        limit = get_limit(request)
+        cursor = request.GET['cursor']
+        if cursor:
+            try:
+                queryset = queryset.filter(**{self.ordering + '__gt': int(cursor)})
+            except ValueError:
+                raise BadRequestError("cursor is not valid")
+
+        # One more item tells whether there is a next page.
+        items = list(queryset.order_by(self.ordering)[:limit + 1])
+        if len(items) > limit:
+            items = items[:limit]
+            self.next_cursor = str(getattr(items[-1], self.ordering))
+        else:
+            self.next_cursor = None
+        return items
+
+    def get_paginated_response(self, data):
+        data = OrderedDict([
+            ('meta', OrderedDict([
+                ('next_cursor', self.next_cursor),
+            ])),
+            ('items', data),
+        ])
+        return Response(data)
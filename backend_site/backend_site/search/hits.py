@@ -0,0 +1,156 @@
+"""
+Record search hits off the request path.
+
+``Query.get(...).add_hit()`` costs a ``get_or_create`` and an upsert of the
+daily hits per search, which contend under load. ``hit_buffer.add()`` only
+counts the hit in memory; a background thread writes the counts of every
+query in bulk, every ``FLUSH_INTERVAL`` seconds or as soon as
+``FLUSH_SIZE`` hits are waiting, and once more when the process exits.
+Hits still buffered when a process is killed are lost, which is fine for
+popularity statistics. Queries are written in batches of ``BATCH_SIZE``,
+each in its own transaction, so a failing batch only loses its own hits.
+
+Options are read from ``settings.SEARCH_HITS``:
+
+``FLUSH_INTERVAL``
+    Seconds between flushes. ``None`` starts no thread; hits are then
+    written by the request that fills the buffer, or by ``flush()``.
+``FLUSH_SIZE``
+    Number of buffered hits that triggers a flush.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from wagtail.search.models import Query, QueryDailyHits
+from wagtail.search.utils import MAX_QUERY_STRING_LENGTH, normalise_query_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'FLUSH_INTERVAL': 10,
+    'FLUSH_SIZE': 1000,
+}
+
+BATCH_SIZE = 100
+
+
+def get_option(name):
+    return dict(DEFAULTS, **getattr(settings, 'SEARCH_HITS', {}))[name]
+
+
+class HitBuffer(object):
+    """
+    Search hits waiting to be written, counted by query string and date.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._size = 0
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, query_string, date=None):
+        if date is None:
+            date = timezone.now().date()
+        with self._lock:
+            # Lowercasing may lengthen the truncated string again.
+            query_string = normalise_query_string(query_string)[:MAX_QUERY_STRING_LENGTH]
+            self._counts[query_string, date] += 1
+            self._size += 1
+            full = self._size >= get_option('FLUSH_SIZE')
+        if get_option('FLUSH_INTERVAL') is None:
+            if full:
+                self.flush()
+        else:
+            self.start()
+            if full:
+                self._wake.set()
+
+    def start(self):
+        # A forked worker does not inherit the thread of its parent.
+        if self.is_running():
+            return
+        with self._lock:
+            if not self.is_running():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self.run, name='search-hits', daemon=True)
+                self._thread.start()
+
+    def is_running(self):
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def run(self):
+        while True:
+            self._wake.wait(get_option('FLUSH_INTERVAL'))
+            self._wake.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                # Keep the thread alive; the next flush may well succeed.
+                logger.exception('Failed to record search hits')
+
+    def flush(self):
+        """
+        Write the buffered hits, with a fixed number of queries per batch.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._size = 0
+        by_query = {}
+        for (query_string, date), hits in counts.items():
+            by_query.setdefault(query_string, {})[query_string, date] = hits
+        groups = list(by_query.values())
+        for i in range(0, len(groups), BATCH_SIZE):
+            batch = Counter()
+            for group in groups[i:i + BATCH_SIZE]:
+                batch.update(group)
+            try:
+                write_hits(batch)
+            except DatabaseError as e:
+                logger.warning('Failed to record %d search hits: %s', sum(batch.values()), e)
+            except Exception:
+                logger.exception('Failed to record %d search hits', sum(batch.values()))
+
+
+def write_hits(counts):
+    """
+    Add ``counts``, hits by normalised query string and date, to the daily
+    hits of their queries.
+    """
+    query_strings = {query_string for query_string, date in counts}
+    dates = {date for query_string, date in counts}
+    with transaction.atomic():
+        Query.objects.bulk_create(
+            [Query(query_string=query_string) for query_string in query_strings], ignore_conflicts=True)
+        query_ids = dict(Query.objects.filter(
+            query_string__in=query_strings).values_list('query_string', 'pk'))
+        QueryDailyHits.objects.bulk_create([
+            QueryDailyHits(query_id=query_ids[query_string], date=date)
+            for query_string, date in counts
+        ], ignore_conflicts=True)
+        daily_hits_ids = {
+            (query_id, date): pk
+            for pk, query_id, date in QueryDailyHits.objects.filter(
+                query_id__in=query_ids.values(), date__in=dates).values_list('pk', 'query_id', 'date')
+        }
+        # One update for every distinct number of hits.
+        by_hits = {}
+        for (query_string, date), hits in counts.items():
+            by_hits.setdefault(hits, []).append(daily_hits_ids[query_ids[query_string], date])
+        for hits, pks in by_hits.items():
+            QueryDailyHits.objects.filter(pk__in=pks).update(hits=F('hits') + hits)
+
+
+hit_buffer = HitBuffer()
+atexit.register(hit_buffer.flush)
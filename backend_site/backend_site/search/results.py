@@ -0,0 +1,109 @@
+"""
+Cached search results.
+
+Running the search backend is the expensive part of a search, and
+paginating its results used to run it again for every page, plus a count.
+``get_ranked_ids()`` keeps the ranked ids of the live pages matching a
+normalised query string in a Django cache, keyed by the content version of
+``backend_site.apicache`` so that publishing drops them. The ids are
+fetched ``FETCH_SIZE`` at a time, as far as the pages asked for need them.
+A page of results then slices the ids and loads its pages in one query.
+
+Options are read from ``settings.SEARCH_RESULTS``:
+
+``CACHE_TIMEOUT``
+    Lifetime of cached ids in seconds; ``0`` disables the cache.
+``MAX_RESULTS``
+    Number of results that can be paged through at most.
+``COUNT``
+    Whether to count the results to number the pages, which means fetching
+    all of their ids. Without it, pages only know whether there is a next
+    one.
+"""
+import hashlib
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+
+from wagtail.core.models import Page
+from wagtail.search.utils import normalise_query_string
+
+from backend_site.apicache import get_content_version
+
+DEFAULTS = {
+    'CACHE_TIMEOUT': 60,
+    'MAX_RESULTS': 1000,
+    'COUNT': False,
+}
+
+FETCH_SIZE = 100
+
+
+def get_option(name):
+    return dict(DEFAULTS, **getattr(settings, 'SEARCH_RESULTS', {}))[name]
+
+
+def get_ranked_ids(query_string, stop=None):
+    """
+    Return ``(ids, complete)``: the ids of the live pages matching
+    ``query_string`` by rank, at least the first ``stop`` of them (all of
+    them up to ``MAX_RESULTS`` by default), and whether there are no more.
+    """
+    query_string = normalise_query_string(query_string)
+    max_results = get_option('MAX_RESULTS')
+    stop = max_results if stop is None else min(stop, max_results)
+    timeout = get_option('CACHE_TIMEOUT')
+    digest = hashlib.sha1(query_string.encode('utf-8')).hexdigest()
+    key = f'search:ids:{get_content_version()}:{digest}'
+
+    if timeout:
+        cached = cache.get(key)
+        if cached is not None and (cached[1] or len(cached[0]) >= stop):
+            return cached
+
+    fetch = min(max_results, FETCH_SIZE * math.ceil(stop / FETCH_SIZE))
+    results = Page.objects.live().only('id').search(query_string)[:fetch]
+    ids = [page.pk for page in results]
+    ranked = (ids, len(ids) < fetch or fetch == max_results)
+    if timeout:
+        cache.set(key, ranked, timeout=timeout)
+    return ranked
+
+
+def get_pages(ids):
+    """
+    Return the live pages with ``ids``, in the same order.
+    """
+    pages = Page.objects.live().in_bulk(ids)
+    return [pages[pk] for pk in ids if pk in pages]
+
+
+class ResultsPage(object):
+    """
+    A page of results that knows whether there is a next one, but not how
+    many pages there are.
+    """
+
+    def __init__(self, object_list, number, has_next):
+        self.object_list = object_list
+        self.number = number
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
@@ -0,0 +1,78 @@
+"""
+Highlighted snippets of search results.
+
+A snippet is a window of the page's searchable text around the first match
+of the query, HTML-escaped, with every match wrapped in ``<mark>``. The
+text is the search description followed by the values of the page's
+``SearchField``s other than the title, which results show anyway.
+"""
+import re
+
+from django.utils.html import escape, strip_tags
+
+from wagtail.core.models import Page
+from wagtail.search import index
+
+SNIPPET_LENGTH = 200
+
+ELLIPSIS = '…'
+
+
+def get_snippets(pages, query_string):
+    """
+    Return the snippets of ``pages`` for ``query_string``, in the same
+    order. Pages that are not instances of their specific class yet are
+    loaded with one query per page type; the others, such as drafts, are
+    used as they are.
+    """
+    generic = [page.pk for page in pages if type(page) is not page.specific_class]
+    specific = Page.objects.filter(pk__in=generic).specific().in_bulk() if generic else {}
+    pattern = get_pattern(query_string)
+    return [
+        highlight(get_search_text(specific.get(page.pk, page)), pattern)
+        for page in pages
+    ]
+
+
+def get_pattern(query_string):
+    terms = sorted(set(query_string.split()), key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+
+
+def get_search_text(page):
+    parts = [page.search_description]
+    for field in page.search_fields:
+        if isinstance(field, index.SearchField) and field.field_name != 'title':
+            value = field.get_value(page)
+            if isinstance(value, (list, tuple)):
+                parts.extend(str(item) for item in value)
+            elif value:
+                parts.append(str(value))
+    return ' '.join(strip_tags(' '.join(part for part in parts if part)).split())
+
+
+def highlight(text, pattern, length=SNIPPET_LENGTH):
+    """
+    Return the escaped window of ``text`` around the first match of
+    ``pattern``, with the matches in it marked.
+    """
+    match = pattern.search(text) if pattern else None
+    start = max(0, match.start() - length // 4) if match else 0
+    if start:
+        # Don't start in the middle of a word.
+        space = text.find(' ', start, match.start())
+        start = space + 1 if space >= 0 else match.start()
+    window = text[start:start + length]
+
+    pieces = [ELLIPSIS] if start else []
+    end = 0
+    for match in pattern.finditer(window) if pattern else ():
+        pieces.append(escape(window[end:match.start()]))
+        pieces.append('<mark>%s</mark>' % escape(match.group()))
+        end = match.end()
+    pieces.append(escape(window[end:]))
+    if start + length < len(text):
+        pieces.append(ELLIPSIS)
+    return ''.join(pieces)
@@ -1,32 +1,52 @@
+import math
+
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.template.response import TemplateResponse
 
-from wagtail.core.models import Page
-from wagtail.search.models import Query
+from .hits import hit_buffer
+from .results import ResultsPage, get_option, get_pages, get_ranked_ids
+
+RESULTS_PER_PAGE = 10
 
 
 def search(request):
     search_query = request.GET.get('query', None)
     page = request.GET.get('page', 1)
 
-    # Search
     if search_query:
-        search_results = Page.objects.live().search(search_query)
-        query = Query.get(search_query)
+        # Record hit, written later in bulk
+        hit_buffer.add(search_query)
 
-        # Record hit
-        query.add_hit()
+    if get_option('COUNT'):
+        # Search
+        ids = get_ranked_ids(search_query)[0] if search_query else []
+
+        # Pagination
+        paginator = Paginator(ids, RESULTS_PER_PAGE)
+        try:
+            search_results = paginator.page(page)
+        except PageNotAnInteger:
+            search_results = paginator.page(1)
+        except EmptyPage:
+            search_results = paginator.page(paginator.num_pages)
+        search_results.object_list = get_pages(search_results.object_list)
     else:
-        search_results = Page.objects.none()
-
-    # Pagination
-    paginator = Paginator(search_results, 10)
-    try:
-        search_results = paginator.page(page)
-    except PageNotAnInteger:
-        search_results = paginator.page(1)
-    except EmptyPage:
-        search_results = paginator.page(paginator.num_pages)
+        try:
+            number = max(int(page), 1)
+        except ValueError:
+            number = 1
+        start = (number - 1) * RESULTS_PER_PAGE
+        stop = start + RESULTS_PER_PAGE
+
+        # Search, one more result telling whether there is a next page
+        ids = get_ranked_ids(search_query, stop + 1)[0] if search_query else []
+        if ids and start >= len(ids):
+            # Past the end, so all the ids are known: show the last page,
+            # as the paginator does.
+            number = math.ceil(len(ids) / RESULTS_PER_PAGE)
+            start = (number - 1) * RESULTS_PER_PAGE
+            stop = start + RESULTS_PER_PAGE
+        search_results = ResultsPage(get_pages(ids[start:stop]), number, has_next=len(ids) > stop)
 
     return TemplateResponse(request, 'search/search.html', {
         'search_query': search_query,
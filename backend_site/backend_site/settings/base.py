@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     'backend_site.home',
     'backend_site.blog',
     'backend_site.search',
+    'backend_site.changes',
 
     'wagtail.contrib.forms',
     'wagtail.contrib.redirects',
@@ -168,8 +169,56 @@ WAGTAIL_SITE_NAME = "backend_site"
 # e.g. in notification emails. Don't include '/admin' or a trailing slash
 BASE_URL = 'http://example.com'
 
+# Frontends to notify when pages change (see backend_site.changes)
+
+CHANGE_WEBHOOKS = []
+CHANGE_WEBHOOK_TOKEN = ''
+CHANGE_WEBHOOK_TIMEOUT = 2
+
 # DRF settings
 
 REST_FRAMEWORK = {
     'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'backend_site.negotiation.IgnoreClientContentNegotiation',
 }
+
+# Decoded page revisions kept in memory for draft listings
+# (see backend_site.drafts)
+
+DRAFT_REVISION_CACHE_SIZE = 1000
+
+# Caches. The content version must be seen by every process (web workers,
+# publish_scheduled_pages, shells), so it is kept on disk.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.versions'),
+    },
+}
+
+# Cache of rendered API responses (see backend_site.apicache)
+
+API_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 300,
+    'CACHE_ALIAS': 'default',
+    'VERSION_CACHE_ALIAS': 'versions',
+}
+
+# Buffered recording of search hits (see backend_site.search.hits)
+
+SEARCH_HITS = {
+    'FLUSH_INTERVAL': 10,
+    'FLUSH_SIZE': 1000,
+}
+
+# Cached search results (see backend_site.search.results)
+
+SEARCH_RESULTS = {
+    'CACHE_TIMEOUT': 60,
+    'MAX_RESULTS': 1000,
+    'COUNT': False,
+}
@@ -11,6 +11,12 @@ ALLOWED_HOSTS = ['*']
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+CHANGE_WEBHOOKS = [
+    'http://localhost:8000/_invalidate/',
+    'http://localhost:8001/_invalidate/',
+]
+CHANGE_WEBHOOK_TOKEN = 'changeme'
+
 
 try:
     from .local import *  # NOQA: F401, F403
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from wagtail.core.models import Page, PageViewRestriction
+
+from backend_site.api import DraftBlogPagesAPIViewSet, DraftPagesAPIViewSet
+from backend_site.blog.models import BlogIndexPage, BlogPage
+
+
+@override_settings(CHANGE_WEBHOOKS=[])
+class TypedQuerysetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        home = Page.objects.get(depth=2)
+        self.index = home.add_child(instance=BlogIndexPage(title='Blog', slug='blog'))
+        self.live = self.index.add_child(instance=BlogPage(title='Live', slug='live'))
+        self.draft = self.index.add_child(instance=BlogPage(title='Draft', slug='draft', live=False))
+        self.private = self.index.add_child(instance=BlogPage(title='Private', slug='private'))
+        PageViewRestriction.objects.create(page=self.private, restriction_type='password', password='x')
+        # Not under the site's root page.
+        Page.objects.get(depth=1).add_child(instance=BlogPage(title='Elsewhere', slug='elsewhere'))
+
+    def get_queryset(self, viewset, **params):
+        view = viewset()
+        view.request = RequestFactory().get('/api/v1/pages/', params, HTTP_HOST='localhost')
+        return view.get_queryset()
+
+    def test_blogs(self):
+        queryset = self.get_queryset(DraftBlogPagesAPIViewSet)
+        self.assertEqual(list(queryset), [self.live])
+        self.assertIsInstance(queryset[0], BlogPage)
+        self.assertNotIn('SELECT U0', str(queryset.query))
+
+        queryset = self.get_queryset(DraftBlogPagesAPIViewSet, draft='1')
+        self.assertEqual(list(queryset), [self.live, self.draft, self.private])
+
+    def test_pages_type(self):
+        queryset = self.get_queryset(DraftPagesAPIViewSet, type='blog.BlogPage')
+        self.assertEqual(list(queryset), [self.live])
+        self.assertNotIn('SELECT U0', str(queryset.query))
+
+        queryset = self.get_queryset(DraftPagesAPIViewSet, type='blog.BlogIndexPage,blog.BlogPage')
+        self.assertEqual(list(queryset.specific()), [self.index, self.live])
+
+        queryset = self.get_queryset(DraftPagesAPIViewSet)
+        self.assertEqual(list(queryset), list(Page.objects.filter(depth__gt=1).exclude(
+            pk__in=[self.draft.pk, self.private.pk]).exclude(slug='elsewhere')))
+
+    def test_listing(self):
+        response = self.client.get('/api/v1/blogs/', HTTP_HOST='localhost')
+        self.assertEqual([item['id'] for item in response.json()['items']], [self.live.pk])
+        response = self.client.get('/api/v1/pages/', {'type': 'nope.Nope'}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,148 @@
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import TestCase, override_settings
+
+from wagtail.core.models import Page, PageViewRestriction, Site
+
+from backend_site.apicache import ResponseCache, get_response_cache
+from backend_site.blog.models import BlogIndexPage, BlogPage
+from backend_site.drafts import revision_cache
+
+
+@override_settings(CHANGE_WEBHOOKS=[])
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revision_cache.clear()
+        home = Page.objects.get(depth=2)
+        self.index = home.add_child(instance=BlogIndexPage(title='Blog', slug='blog'))
+        self.post = self.index.add_child(instance=BlogPage(title='Post', slug='post'))
+        self.post.save_revision().publish()
+
+    def get(self, path, **params):
+        response = self.client.get(path, params, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def titles(self, response):
+        return [item['title'] for item in response.json()['items']]
+
+    def test_hit(self):
+        response = self.get('/api/v1/blogs/', fields='title', limit='10')
+        with self.assertNumQueries(0):
+            cached = self.get('/api/v1/blogs/', limit='10', fields='title')
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached['Content-Type'], response['Content-Type'])
+
+        # Other endpoints, paths and parameters have their own entries.
+        with self.assertNumQueries(0):
+            self.get('/api/v1/blogs/', fields='title', limit='10')
+        self.assertNotEqual(self.get('/api/v1/pages/', fields='title').content, response.content)
+        self.assertNotEqual(self.get('/api/v1/blogs/', fields='_,title').content, response.content)
+        self.get(f'/api/v1/blogs/{self.post.pk}/')
+        with self.assertNumQueries(0):
+            self.get(f'/api/v1/blogs/{self.post.pk}/')
+
+    def test_invalidate(self):
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title')), ['Post'])
+
+        self.post.title = 'Draft'
+        self.post.save_revision()
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title')), ['Post'])
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title', draft='1')), ['Draft'])
+
+        self.post.get_latest_revision().publish()
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title')), ['Draft'])
+
+        self.post.unpublish()
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title')), [])
+
+    def test_move(self):
+        other = Page.objects.get(depth=2).add_child(instance=BlogIndexPage(title='Other', slug='other'))
+        self.get('/api/v1/blogs/', fields='html_url')
+        Page.objects.get(pk=self.post.pk).move(other, pos='last-child')
+        response = self.get('/api/v1/blogs/', fields='html_url')
+        self.assertEqual(response.json()['items'][0]['meta']['html_url'], 'http://localhost/other/post/')
+
+    def test_version_shared_between_processes(self):
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title')), ['Post'])
+        # Another process changes the page and bumps the version through
+        # its own instance of the cache.
+        BlogPage.objects.filter(pk=self.post.pk).update(title='Changed')
+        other = FileBasedCache(caches['versions']._dir, {})
+        with mock.patch.object(ResponseCache, 'version_cache', other):
+            get_response_cache().bump_content_version()
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title')), ['Changed'])
+
+    def test_validators(self):
+        response = self.get('/api/v1/blogs/')
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        self.assertEqual(self.get('/api/v1/blogs/')['ETag'], etag)
+        self.assertNotEqual(self.get('/api/v1/pages/')['ETag'], etag)
+
+        # Cached responses are validated without the ORM.
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/blogs/', HTTP_HOST='localhost', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        response = self.client.get('/api/v1/blogs/', HTTP_HOST='localhost', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        # Responses that are not in the cache are built.
+        cache.delete(self.make_key(response))
+        response = self.client.get('/api/v1/blogs/', HTTP_HOST='localhost', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], etag)
+        for path in ['/api/v1/pages/9999/', f'/api/v1/pages/{self.post.pk}/']:
+            response = self.client.get(path, HTTP_HOST='localhost', HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertNotEqual(response.status_code, 304)
+        response = self.client.get(
+            '/api/v1/pages/9999/', HTTP_HOST='localhost', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 404)
+
+        self.post.save_revision().publish()
+        response = self.client.get('/api/v1/blogs/', HTTP_HOST='localhost', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertNotEqual(response['Last-Modified'], last_modified)
+        response = self.client.get('/api/v1/blogs/', HTTP_HOST='localhost', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.get('/api/v1/blogs/', draft='1')
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_view_restrictions(self):
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title')), ['Post'])
+        restriction = PageViewRestriction.objects.create(
+            page=self.index, restriction_type=PageViewRestriction.PASSWORD, password='secret')
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title')), [])
+        restriction.delete()
+        self.assertEqual(self.titles(self.get('/api/v1/blogs/', fields='title')), ['Post'])
+
+    def test_site_changes(self):
+        response = self.get('/api/v1/blogs/', fields='html_url')
+        self.assertEqual(response.json()['items'][0]['meta']['html_url'], 'http://localhost/blog/post/')
+        site = Site.objects.get(is_default_site=True)
+        site.root_page = Page.objects.get(depth=1)
+        site.save()
+        response = self.get('/api/v1/blogs/', fields='html_url')
+        self.assertEqual(response.json()['items'][0]['meta']['html_url'], 'http://localhost/home/blog/post/')
+
+    def test_not_cached(self):
+        response = self.get('/api/v1/blogs/', draft='1')
+        self.assertIsNone(cache.get(self.make_key(response)))
+
+        response = self.client.get('/api/v1/pages/', {'type': 'nope.Nope'}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(cache.get(self.make_key(response, 'DraftPagesAPIViewSet')))
+
+        with override_settings(API_RESPONSE_CACHE={'ENABLED': False}):
+            response = self.get('/api/v1/blogs/')
+            self.assertIsNone(cache.get(self.make_key(response)))
+
+    def make_key(self, response, endpoint='DraftBlogPagesAPIViewSet'):
+        return get_response_cache().make_key(response.wsgi_request, endpoint)
@@ -0,0 +1,161 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from wagtail.core.models import Page
+
+from taggit.models import Tag
+
+from backend_site.blog import tag_index
+from backend_site.blog.models import BlogIndexPage, BlogPage, BlogTagIndexEntry
+from backend_site.drafts import revision_cache
+
+
+@override_settings(CHANGE_WEBHOOKS=[])
+class BlogTagsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        home = Page.objects.get(depth=2)
+        self.index = home.add_child(instance=BlogIndexPage(title='Blog', slug='blog'))
+
+    def add_post(self, slug, tags):
+        post = self.index.add_child(instance=BlogPage(title=slug, slug=slug))
+        post.tags.add(*tags)
+        post.save_revision().publish()
+        return post
+
+    def child_tags(self):
+        return [(tag.name, tag.url) for tag in self.index.get_child_tags()]
+
+    def test_get_tags(self):
+        post = self.add_post('post', ['one', 'two', 'three'])
+        self.index.url  # Warm up the site root paths.
+        post = BlogPage.objects.get(pk=post.pk)
+        # The tags with their tagged items, and the parent page.
+        with self.assertNumQueries(2):
+            tags = post.get_tags
+        self.assertEqual(
+            sorted((tag.name, tag.url) for tag in tags),
+            [('one', '/blog/tags/one'), ('three', '/blog/tags/three'), ('two', '/blog/tags/two')])
+
+    def test_get_child_tags(self):
+        self.add_post('first', ['Beta', 'alpha'])
+        self.add_post('second', ['alpha', 'gamma'])
+        draft = self.index.add_child(instance=BlogPage(title='draft', slug='draft', live=False))
+        draft.tags.add('hidden')
+        draft.save()
+        self.assertEqual(self.child_tags(), [
+            ('alpha', '/blog/tags/alpha'), ('Beta', '/blog/tags/beta'), ('gamma', '/blog/tags/gamma'),
+        ])
+        with self.assertNumQueries(0):
+            self.child_tags()
+
+        # Publishing a post gives its tags straight away.
+        draft.save_revision().publish()
+        self.assertIn(('hidden', '/blog/tags/hidden'), self.child_tags())
+
+    def test_get_child_tags_queries(self):
+        self.add_post('first', ['a', 'b'])
+        self.index.url  # Warm up the site root paths.
+        with self.assertNumQueries(1):
+            self.index.get_child_tags()
+
+        for i in range(20):
+            self.add_post(f'post-{i}', [f'tag-{i}', f'other-{i}'])
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.index.get_child_tags()), 42)
+
+
+@override_settings(CHANGE_WEBHOOKS=[])
+class TagIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revision_cache.clear()
+        self.home = Page.objects.get(depth=2)
+        self.index = self.home.add_child(instance=BlogIndexPage(title='Blog', slug='blog'))
+
+    def add_post(self, slug, tags, parent=None):
+        post = (parent or self.index).add_child(instance=BlogPage(title=slug, slug=slug, live=False))
+        post.tags.add(*tags)
+        post.save_revision().publish()
+        return BlogPage.objects.get(pk=post.pk)
+
+    def entries(self):
+        return sorted(BlogTagIndexEntry.objects.values_list('index__slug', 'tag__name', 'post__slug'))
+
+    def expected_entries(self):
+        # What the tree says, the way the tag archive used to read it.
+        return sorted(
+            (index.slug, tag.name, post.slug)
+            for index in BlogIndexPage.objects.all()
+            for post in BlogPage.objects.live().descendant_of(index)
+            for tag in post.tags.all()
+        )
+
+    def assertIndexed(self, entries):
+        self.assertEqual(self.entries(), entries)
+        self.assertEqual(self.entries(), self.expected_entries())
+
+    def test_publish(self):
+        post = self.add_post('post', ['a', 'b'])
+        self.assertIndexed([('blog', 'a', 'post'), ('blog', 'b', 'post')])
+
+        # Tags of drafts are only filed once published.
+        post.tags.set('b', 'c')
+        post.save_revision()
+        self.assertIndexed([('blog', 'a', 'post'), ('blog', 'b', 'post')])
+        post.get_latest_revision().publish()
+        self.assertIndexed([('blog', 'b', 'post'), ('blog', 'c', 'post')])
+
+        post.unpublish()
+        self.assertIndexed([])
+        post.get_latest_revision().publish()
+        self.assertIndexed([('blog', 'b', 'post'), ('blog', 'c', 'post')])
+
+        Page.objects.get(pk=post.pk).delete()
+        self.assertIndexed([])
+
+    def test_tag_edits(self):
+        post = self.add_post('post', ['a'])
+        post.tags.add('b')
+        post.save()
+        self.assertIndexed([('blog', 'a', 'post'), ('blog', 'b', 'post')])
+        Tag.objects.get(name='a').delete()
+        self.assertIndexed([('blog', 'b', 'post')])
+
+    def test_move(self):
+        self.add_post('first', ['a'])
+        self.add_post('second', ['a'])
+        other = self.home.add_child(instance=BlogIndexPage(title='Other', slug='other'))
+        Page.objects.get(slug='second').move(other, pos='last-child')
+        self.assertIndexed([('blog', 'a', 'first'), ('other', 'a', 'second')])
+
+        # Moving an index takes its posts along.
+        folder = self.home.add_child(instance=Page(title='Folder', slug='folder'))
+        Page.objects.get(pk=other.pk).move(folder, pos='last-child')
+        self.assertIndexed([('blog', 'a', 'first'), ('other', 'a', 'second')])
+
+    def test_rebuild(self):
+        self.add_post('post', ['a', 'b'])
+        BlogTagIndexEntry.objects.all().delete()
+        tag_index.rebuild()
+        self.assertIndexed([('blog', 'a', 'post'), ('blog', 'b', 'post')])
+
+    def test_tag_archive(self):
+        first = self.add_post('first', ['a', 'b'])
+        second = self.add_post('second', ['B'])
+        self.add_post('third', [])
+        tag = Tag.objects.get(name='a')
+        with self.assertNumQueries(1):
+            self.assertEqual(list(self.index.get_posts(tag=tag)), [first])
+
+        index = BlogIndexPage.objects.get(pk=self.index.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(index.tag_index, [
+                {'name': 'a', 'slug': 'a', 'posts': [first.pk]},
+                {'name': 'b', 'slug': 'b', 'posts': [first.pk]},
+                {'name': 'B', 'slug': 'b_1', 'posts': [second.pk]},
+            ])
+
+        response = self.client.get(
+            f'/api/v1/pages/{self.index.pk}/', {'fields': 'tag_index'}, HTTP_HOST='localhost')
+        self.assertEqual(response.json()['tag_index'], index.tag_index)
@@ -0,0 +1,90 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+from wagtail.core.models import Page
+
+from backend_site.changes import notify
+
+
+@override_settings(CHANGE_WEBHOOKS=['http://frontend/invalidate/'], CHANGE_WEBHOOK_TOKEN='token')
+class ChangeNotificationTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        # The tables are emptied after each test, root page included.
+        root = Page.get_first_root_node() or Page.add_root(instance=Page(title='Root', slug='root'))
+        self.home = root.add_child(instance=Page(title='Home', slug='notify-home'))
+        patcher = mock.patch('backend_site.changes.notify.requests.post')
+        self.post = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sent(self):
+        # Wait for the batches queued so far.
+        notify.get_executor().submit(int).result()
+        batches = [
+            [(event['event'], event['page_id'], event['draft']) for event in call[1]['json']['events']]
+            for call in self.post.call_args_list
+        ]
+        self.post.reset_mock()
+        return batches
+
+    def test_autocommit(self):
+        page = self.home.add_child(instance=Page(title='Page', slug='page', live=False))
+        self.sent()
+
+        page.save_revision()
+        self.assertEqual(self.sent(), [[('revision_saved', page.pk, True)]])
+        page.get_latest_revision().publish()
+        self.assertIn([('page_published', page.pk, False)], self.sent())
+        Page.objects.get(pk=page.pk).unpublish()
+        self.assertIn([('page_unpublished', page.pk, False)], self.sent())
+        page.delete()
+        self.assertIn([('page_deleted', page.pk, False)], self.sent())
+
+    def test_background(self):
+        threads = []
+        self.post.side_effect = lambda *args, **kwargs: threads.append(threading.current_thread().name)
+        self.home.save_revision()
+        notify.get_executor().submit(int).result()
+        self.assertTrue(threads[0].startswith('change-webhooks'))
+        self.post.assert_called_once_with(
+            'http://frontend/invalidate/', json=mock.ANY, headers={'X-Invalidation-Token': 'token'}, timeout=2)
+
+    def test_atomic(self):
+        page = self.home.add_child(instance=Page(title='Page', slug='page', live=False))
+        self.sent()
+
+        with transaction.atomic():
+            page.save_revision().publish()
+            Page.objects.get(pk=page.pk).unpublish()
+            self.assertEqual(self.sent(), [])
+        self.assertEqual(self.sent(), [[
+            ('revision_saved', page.pk, True),
+            ('page_changed', page.pk, False),
+            ('page_published', page.pk, False),
+            ('page_unpublished', page.pk, False),
+        ]])
+
+    def test_rollback(self):
+        page = self.home.add_child(instance=Page(title='Page', slug='page', live=False))
+        self.sent()
+
+        with transaction.atomic():
+            page.save_revision()
+            transaction.set_rollback(True)
+        self.assertEqual(self.sent(), [])
+
+        # Events of the rolled back transaction are not sent later on.
+        with transaction.atomic():
+            page.title = 'Changed'
+            page.save()
+        self.assertEqual(self.sent(), [[('page_changed', page.pk, False)]])
+
+    def test_failure(self):
+        self.post.side_effect = notify.requests.ConnectionError('refused')
+        with self.assertLogs('backend_site.changes.notify', 'WARNING'):
+            self.home.save_revision()
+            self.sent()
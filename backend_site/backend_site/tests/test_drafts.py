@@ -0,0 +1,78 @@
+from django.db import connection
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from taggit.models import Tag
+from wagtail.core.models import Page
+
+from backend_site.blog.models import BlogIndexPage, BlogPage
+from backend_site.drafts import get_latest_revisions_as_pages, revision_cache
+
+
+@override_settings(CHANGE_WEBHOOKS=[], WAGTAILAPI_LIMIT_MAX=100)
+class DraftListingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revision_cache.clear()
+        home = Page.objects.get(depth=2)
+        self.index = home.add_child(instance=BlogIndexPage(title='Blog', slug='blog'))
+        self.posts = []
+        for i in range(30):
+            post = self.index.add_child(instance=BlogPage(title=f'Post {i}', slug=f'post-{i}'))
+            post.save_revision().publish()
+            if i % 3:
+                post.title = f'Draft {i}'
+                post.slug = f'draft-{i}'
+                post.save_revision()
+            self.posts.append(post)
+
+    def get_listing(self, limit):
+        response = self.client.get('/api/v1/blogs/', {
+            'draft': '1', 'limit': limit, 'fields': 'title,body,html_url', 'order': 'id',
+        }, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['items']
+
+    def test_listing(self):
+        items = self.get_listing(30)
+        expected = [Page.objects.get(pk=post.pk).get_latest_revision_as_page() for post in self.posts]
+        self.assertEqual([item['title'] for item in items], [page.title for page in expected])
+        self.assertEqual(items[1]['title'], 'Draft 1')
+        self.assertEqual(items[1]['meta']['html_url'], 'http://localhost/blog/draft-1/')
+
+    def test_listing_queries(self):
+        # Fill the caches of sites and content types.
+        self.get_listing(1)
+        revision_cache.clear()
+        with CaptureQueriesContext(connection) as few:
+            self.get_listing(3)
+        with CaptureQueriesContext(connection) as many:
+            self.get_listing(30)
+        self.assertEqual(len(many), len(few))
+
+        # Decoded revisions are reused.
+        with CaptureQueriesContext(connection) as cached:
+            self.get_listing(30)
+        self.assertEqual(len(cached), len(many) - 1)
+
+    def test_same_as_latest_revision(self):
+        pages = get_latest_revisions_as_pages(list(Page.objects.filter(pk__in=[p.pk for p in self.posts])))
+        for page in pages:
+            expected = Page.objects.get(pk=page.pk).get_latest_revision_as_page()
+            self.assertIs(type(page), type(expected))
+            for field in ('title', 'slug', 'url_path', 'live', 'has_unpublished_changes', 'owner_id'):
+                self.assertEqual(getattr(page, field), getattr(expected, field))
+
+    def test_missing_foreign_keys(self):
+        post = self.posts[1]
+        post.tags.add('kept', 'deleted')
+        post.save_revision()
+        Tag.objects.filter(name='deleted').delete()
+
+        page, = get_latest_revisions_as_pages([post])
+        expected = Page.objects.get(pk=post.pk).get_latest_revision_as_page()
+        self.assertEqual([tag.name for tag in page.tags.all()], ['kept'])
+        self.assertEqual(
+            [tag.name for tag in page.tags.all()],
+            [tag.name for tag in expected.tags.all()])
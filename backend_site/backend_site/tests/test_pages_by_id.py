@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+
+from wagtail.core.models import Page
+
+from backend_site.blog.models import BlogIndexPage, BlogPage
+from backend_site.drafts import revision_cache
+
+
+@override_settings(CHANGE_WEBHOOKS=[], API_RESPONSE_CACHE={'ENABLED': False}, WAGTAILAPI_LIMIT_MAX=50)
+class PagesByIdTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revision_cache.clear()
+        home = Page.objects.get(depth=2)
+        self.index = home.add_child(instance=BlogIndexPage(title='Blog', slug='blog'))
+        self.posts = []
+        for i in range(20):
+            post = self.index.add_child(instance=BlogPage(title=f'Post {i}', slug=f'post-{i}'))
+            post.save_revision().publish()
+            post.title = f'Draft {i}'
+            post.save_revision()
+            self.posts.append(post)
+        self.hidden = self.index.add_child(instance=BlogPage(title='Hidden', slug='hidden', live=False))
+
+    def get(self, **params):
+        return self.client.get('/api/v1/pages-by-id/', params, HTTP_HOST='localhost')
+
+    def get_items(self, ids, **params):
+        response = self.get(ids=','.join(str(pk) for pk in ids), **params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['items']
+
+    def test_pages(self):
+        ids = [self.posts[5].pk, self.hidden.pk, self.index.pk, self.posts[1].pk, self.posts[5].pk, 9999]
+        items = self.get_items(ids, fields='title')
+        self.assertEqual(
+            [(item['id'], item['title']) for item in items],
+            [(self.posts[5].pk, 'Post 5'), (self.index.pk, 'Blog'), (self.posts[1].pk, 'Post 1')])
+
+        items = self.get_items(ids, fields='title', draft='1')
+        self.assertEqual(
+            [item['title'] for item in items], ['Draft 5', 'Hidden', 'Blog', 'Draft 1'])
+
+        items = self.get_items(ids, type='blog.BlogPage', fields='body')
+        self.assertEqual([item['id'] for item in items], [self.posts[5].pk, self.posts[1].pk])
+        self.assertIn('body', items[0])
+
+    def test_queries(self):
+        for params in ({}, {'draft': '1'}):
+            self.get_items([self.posts[0].pk], **params)
+            counts = []
+            for posts in (self.posts[:3], self.posts):
+                with CaptureQueriesContext(connection) as queries:
+                    self.get_items([post.pk for post in posts], type='blog.BlogPage', fields='html_url', **params)
+                counts.append(len(queries))
+            self.assertEqual(counts[0], counts[1], params)
+
+    def test_bad_request(self):
+        for params in [{}, {'ids': ''}, {'ids': '1,x'}, {'ids': '0'}, {'ids': '1', 'offset': '1'},
+                       {'ids': ','.join(str(i) for i in range(1, 52))}]:
+            self.assertEqual(self.get(**params).status_code, 400, params)
+        self.assertEqual(reverse('wagtailapi:pages-by-id:listing'), '/api/v1/pages-by-id/')
+        with self.assertRaises(NoReverseMatch):
+            reverse('wagtailapi:pages-by-id:detail', args=[self.index.pk])
+
+    def test_detail_url(self):
+        item, = self.get_items([self.index.pk])
+        self.assertEqual(item['meta']['detail_url'], f'http://localhost/api/v1/pages/{self.index.pk}/')
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from wagtail.core.models import Page
+
+from backend_site.blog.models import BlogIndexPage, BlogPage
+from backend_site.drafts import revision_cache
+
+
+@override_settings(CHANGE_WEBHOOKS=[])
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revision_cache.clear()
+        home = Page.objects.get(depth=2)
+        self.index = home.add_child(instance=BlogIndexPage(title='Blog', slug='blog'))
+        self.posts = []
+        for i in range(7):
+            post = self.index.add_child(instance=BlogPage(title=f'Post {i}', slug=f'post-{i}'))
+            post.save_revision().publish()
+            # Make the tree order the reverse of the id order.
+            Page.objects.get(pk=post.pk).move(self.index, pos='first-child')
+            self.posts.append(post)
+        self.posts[3].title = 'Draft'
+        self.posts[3].save_revision()
+
+    def get(self, path, **params):
+        return self.client.get(path, params, HTTP_HOST='localhost')
+
+    def walk(self, path, **params):
+        items = []
+        cursor = ''
+        while cursor is not None:
+            response = self.get(path, cursor=cursor, limit=3, **params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertNotIn('total_count', data['meta'])
+            items += data['items']
+            cursor = data['meta']['next_cursor']
+        return items
+
+    def test_walk(self):
+        with CaptureQueriesContext(connection) as queries:
+            items = self.walk('/api/v1/blogs/', fields='title')
+        self.assertEqual([item['id'] for item in items], [post.pk for post in self.posts])
+        self.assertEqual(items[3]['title'], 'Post 3')
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql']])
+
+    def test_walk_draft(self):
+        items = self.walk('/api/v1/blogs/', fields='title', draft='1')
+        self.assertEqual([item['id'] for item in items], [post.pk for post in self.posts])
+        self.assertEqual(items[3]['title'], 'Draft')
+
+    def test_last_page(self):
+        data = self.get('/api/v1/blogs/', cursor=self.posts[-2].pk).json()
+        self.assertEqual([item['id'] for item in data['items']], [self.posts[-1].pk])
+        self.assertIsNone(data['meta']['next_cursor'])
+
+    def test_bad_request(self):
+        for params in [{'cursor': 'x'}, {'cursor': '', 'offset': 3}, {'cursor': '', 'order': 'title'},
+                       {'cursor': '', 'search': 'post'}, {'cursor': '', 'limit': 0}]:
+            self.assertEqual(self.get('/api/v1/pages/', **params).status_code, 400, params)
@@ -0,0 +1,191 @@
+import datetime
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from wagtail.core.models import Page
+from wagtail.search.models import Query, QueryDailyHits
+
+from backend_site.search import hits
+from backend_site.search.hits import HitBuffer, hit_buffer
+from backend_site.search.results import get_ranked_ids
+
+
+@override_settings(
+    SEARCH_HITS={'FLUSH_INTERVAL': None, 'FLUSH_SIZE': 100},
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class SearchHitsTests(TestCase):
+    def setUp(self):
+        hit_buffer.flush()
+
+    def hits(self):
+        return {query.query_string: query.hits for query in Query.objects.all()}
+
+    def test_search_buffers_hits(self):
+        for query in ['Hello', 'hello ', 'world']:
+            response = self.client.get('/search/', {'query': query}, HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.hits(), {})
+
+        hit_buffer.flush()
+        self.assertEqual(self.hits(), {'hello': 2, 'world': 1})
+
+    def test_flush(self):
+        today = datetime.date(2020, 1, 2)
+        yesterday = datetime.date(2020, 1, 1)
+        Query.get('old').add_hit(date=today)
+        for query, date in [('old', today), ('old', yesterday), ('new', today), ('new', today)]:
+            hit_buffer.add(query, date=date)
+        with self.assertNumQueries(8):
+            hit_buffer.flush()
+        self.assertEqual(
+            sorted(QueryDailyHits.objects.values_list('query__query_string', 'date', 'hits')),
+            [('new', today, 2), ('old', yesterday, 1), ('old', today, 2)])
+
+        with self.assertNumQueries(0):
+            hit_buffer.flush()
+
+    @override_settings(SEARCH_HITS={'FLUSH_INTERVAL': None, 'FLUSH_SIZE': 3})
+    def test_flush_size(self):
+        hit_buffer.add('one')
+        hit_buffer.add('two')
+        self.assertEqual(self.hits(), {})
+        hit_buffer.add('one')
+        self.assertEqual(self.hits(), {'one': 2, 'two': 1})
+
+    def test_long_query_string(self):
+        hit_buffer.add('x' * 300)
+        hit_buffer.add('\u0130' * 200)
+        hit_buffer.flush()
+        self.assertEqual(sorted(len(query_string) for query_string in self.hits()), [255, 255])
+
+    def test_failed_batch(self):
+        write_hits = hits.write_hits
+
+        def fail_bad(counts):
+            if ('bad', datetime.date(2020, 1, 1)) in counts:
+                raise DatabaseError('value too long')
+            write_hits(counts)
+
+        for query in ['bad', 'good', 'better']:
+            hit_buffer.add(query, date=datetime.date(2020, 1, 1))
+        with mock.patch('backend_site.search.hits.BATCH_SIZE', 1), \
+                mock.patch('backend_site.search.hits.write_hits', fail_bad), \
+                self.assertLogs('backend_site.search.hits', 'WARNING'):
+            hit_buffer.flush()
+        self.assertEqual(self.hits(), {'good': 1, 'better': 1})
+
+    @override_settings(SEARCH_HITS={'FLUSH_INTERVAL': 0.01, 'FLUSH_SIZE': 1})
+    def test_thread_survives_errors(self):
+        buffer = HitBuffer()
+        written = []
+
+        def write_hits(counts):
+            if not written:
+                written.append(None)
+                raise KeyError('boom')
+            written.extend(query_string for query_string, date in counts)
+
+        def wait_for(count):
+            deadline = time.monotonic() + 5
+            while len(written) < count and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        with mock.patch('backend_site.search.hits.write_hits', write_hits), \
+                self.assertLogs('backend_site.search.hits', 'ERROR'):
+            buffer.add('one')
+            wait_for(1)
+            buffer.add('two')
+            wait_for(2)
+        self.assertEqual(written, [None, 'two'])
+
+        # A thread that died anyway is replaced.
+        buffer._thread.is_alive = lambda: False
+        thread = buffer._thread
+        buffer.start()
+        self.assertIsNot(buffer._thread, thread)
+        self.assertTrue(buffer._thread.is_alive())
+
+
+@override_settings(
+    CHANGE_WEBHOOKS=[],
+    SEARCH_HITS={'FLUSH_INTERVAL': None, 'FLUSH_SIZE': 100},
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class SearchResultsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        home = Page.objects.get(depth=2)
+        self.pages = [
+            home.add_child(instance=Page(title=f'Apple {i}', slug=f'apple-{i}')) for i in range(25)]
+        home.add_child(instance=Page(title='Pear', slug='pear'))
+
+    def search(self, **params):
+        response = self.client.get('/search/', params, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        return response.context['search_results']
+
+    def titles(self, results):
+        return [page.title for page in results]
+
+    def test_ranked_ids(self):
+        ids, complete = get_ranked_ids('Apple')
+        self.assertEqual(sorted(ids), sorted(page.pk for page in self.pages))
+        self.assertTrue(complete)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_ranked_ids(' APPLE '), (ids, True))
+
+        # Publishing drops them.
+        self.pages[0].unpublish()
+        self.assertNotIn(self.pages[0].pk, get_ranked_ids('apple')[0])
+
+    @override_settings(SEARCH_RESULTS={'MAX_RESULTS': 20})
+    def test_max_results(self):
+        ids, complete = get_ranked_ids('apple')
+        self.assertEqual(len(ids), 20)
+        self.assertTrue(complete)
+
+    def test_fetch_size(self):
+        with mock.patch('backend_site.search.results.FETCH_SIZE', 10):
+            ids, complete = get_ranked_ids('apple', 5)
+            self.assertEqual((len(ids), complete), (10, False))
+            with self.assertNumQueries(0):
+                get_ranked_ids('apple', 10)
+            ids, complete = get_ranked_ids('apple', 11)
+            self.assertEqual((len(ids), complete), (20, False))
+            ids, complete = get_ranked_ids('apple', 21)
+            self.assertEqual((len(ids), complete), (25, True))
+            with self.assertNumQueries(0):
+                get_ranked_ids('apple', 1000)
+
+    def test_count_free(self):
+        ids = get_ranked_ids('apple')[0]
+        first = self.search(query='apple')
+        self.assertEqual([page.pk for page in first], ids[:10])
+        self.assertTrue(first.has_next())
+        self.assertFalse(first.has_previous())
+
+        last = self.search(query='apple', page='3')
+        self.assertEqual([page.pk for page in last], ids[20:])
+        self.assertFalse(last.has_next())
+        self.assertEqual(last.previous_page_number(), 2)
+
+        # Past the end, the last page is shown.
+        past = self.search(query='apple', page='4')
+        self.assertEqual((past.number, [page.pk for page in past]), (3, ids[20:]))
+        self.assertFalse(past.has_next())
+        self.assertEqual(self.search(query='apple', page='100').number, 3)
+        self.assertEqual(self.search(query='apple', page='x').number, 1)
+        self.assertEqual(len(self.search()), 0)
+
+    @override_settings(SEARCH_RESULTS={'COUNT': True})
+    def test_count(self):
+        ids = get_ranked_ids('apple')[0]
+        last = self.search(query='apple', page='4')
+        self.assertEqual(last.paginator.count, 25)
+        self.assertEqual([page.pk for page in last], ids[20:])
+        self.assertEqual(len(self.search()), 0)
@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from wagtail.core.models import Page
+
+from backend_site.blog.models import BlogIndexPage, BlogPage
+from backend_site.drafts import revision_cache
+from backend_site.search.snippets import get_pattern, highlight
+
+
+@override_settings(CHANGE_WEBHOOKS=[])
+class SearchAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revision_cache.clear()
+        home = Page.objects.get(depth=2)
+        self.index = home.add_child(instance=BlogIndexPage(title='Blog', slug='blog'))
+        self.posts = []
+        for i in range(5):
+            post = self.index.add_child(instance=BlogPage(
+                title=f'Apple {i}', slug=f'apple-{i}', body=f'<p>Post {i} about an apple & a pear.</p>'))
+            post.save_revision().publish()
+            self.posts.append(post)
+        self.hidden = self.index.add_child(instance=BlogPage(title='Apple hidden', slug='hidden', live=False))
+
+    def get(self, **params):
+        return self.client.get('/api/v1/search/', params, HTTP_HOST='localhost')
+
+    def get_data(self, **params):
+        response = self.get(**params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_search(self):
+        data = self.get_data(query='apple', fields='title', limit='3')
+        self.assertEqual(len(data['items']), 3)
+        item = data['items'][0]
+        self.assertEqual(set(item), {'id', 'meta', 'title', 'snippet'})
+        self.assertIn('<mark>apple</mark> &amp; a pear.', item['snippet'])
+        self.assertEqual(data['meta']['next_cursor'], '3')
+
+        rest = self.get_data(query='apple', fields='title', limit='3', cursor='3')
+        self.assertIsNone(rest['meta']['next_cursor'])
+        ids = [item['id'] for item in data['items'] + rest['items']]
+        self.assertEqual(sorted(ids), sorted(post.pk for post in self.posts))
+
+        self.assertEqual(self.get_data(query='banana')['items'], [])
+        self.assertEqual(self.get_data()['items'], [])
+
+    def test_cached(self):
+        data = self.get_data(query='apple')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_data(query='apple'), data)
+
+        self.posts[0].unpublish()
+        ids = [item['id'] for item in self.get_data(query='apple')['items']]
+        self.assertNotIn(self.posts[0].pk, ids)
+
+    def test_draft(self):
+        post = self.posts[0]
+        post.title = 'Draft'
+        post.body = '<p>An apple in a draft.</p>'
+        post.save_revision()
+        items = {item['id']: item for item in self.get_data(query='apple', fields='title', draft='1')['items']}
+        self.assertEqual(items[post.pk]['title'], 'Draft')
+        self.assertEqual(items[post.pk]['snippet'], 'An <mark>apple</mark> in a draft.')
+
+        items = {item['id']: item for item in self.get_data(query='apple', fields='title')['items']}
+        self.assertIn('Post 0', items[post.pk]['snippet'])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.get(query='apple', cursor='x').status_code, 400)
+        self.assertEqual(self.get(query='apple', cursor='-1').status_code, 400)
+        self.assertEqual(self.get(query='apple', limit='0').status_code, 400)
+        self.assertEqual(self.get(query='apple', offset='10').status_code, 400)
+        self.assertEqual(self.get(query='apple', fields='nope').status_code, 400)
+
+    def test_highlight(self):
+        pattern = get_pattern('Fox  dog')
+        text = 'The quick brown fox jumps over the lazy dog. ' * 10
+        snippet = highlight(text, pattern, length=60)
+        self.assertEqual(
+            snippet,
+            '…quick brown <mark>fox</mark> jumps over the lazy <mark>dog</mark>. The quick brown <mark>fox</mark>…')
+        snippet = highlight('x' * 100 + ' a <fox>', pattern, length=20)
+        self.assertEqual(snippet, '…a &lt;<mark>fox</mark>&gt;')
+        self.assertEqual(highlight('a < b', None), 'a &lt; b')
@@ -0,0 +1,209 @@
+"""
+Dependency graph of templates.
+
+A template depends on the templates named in its ``{% extends %}`` and
+``{% include %}`` tags. References that are not string literals can't be
+followed and are recorded as ``DYNAMIC``.
+
+It also depends on the fields of the ``data`` variable it uses, see
+``find_data_fields()``.
+"""
+from django.template import Engine, TemplateSyntaxError
+from django.template.base import FilterExpression, Lexer, Node, NodeList, TokenType, Variable
+from django.template.defaulttags import ForNode, IfNode, WithNode
+
+DYNAMIC = '*'
+
+DATA_VARIABLE = 'data'
+
+REFERENCE_TAGS = ('extends', 'include')
+
+
+def find_references(content):
+    references = []
+    for token in Lexer(content or '').tokenize():
+        if token.token_type != TokenType.BLOCK:
+            continue
+        bits = token.split_contents()
+        if len(bits) < 2 or bits[0] not in REFERENCE_TAGS:
+            continue
+        name = bits[1]
+        if len(name) >= 2 and name[0] in '"\'' and name[-1] == name[0]:
+            name = name[1:-1]
+        else:
+            name = DYNAMIC
+        if name not in references:
+            references.append(name)
+    return references
+
+
+def parse_references(value):
+    return [name for name in (value or '').splitlines() if name]
+
+
+def format_references(references):
+    return '\n'.join(references)
+
+
+def closure(graph, names):
+    """
+    Return ``names`` and every template they depend on, directly or not.
+    """
+    result = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in result:
+            continue
+        result.add(name)
+        pending.extend(graph.get(name, ()))
+    return result
+
+
+class _Dynamic(Exception):
+    pass
+
+
+class DataFieldsFinder(object):
+    """
+    Walk a compiled template and collect the fields of ``data`` it uses.
+
+    ``data`` is either a page, or a listing with ``data.items`` and
+    ``data.meta.total_count``. Items of a listing count as pages, so the
+    fields used on them are collected as well. Aliases made by ``{% for %}``
+    and ``{% with %}`` are followed. Any other use of a page as a whole,
+    e.g. ``{{ data }}`` or passing it to an included template, means that
+    the fields can't be determined.
+    """
+
+    def __init__(self):
+        self.fields = set()
+
+    def resolve(self, lookups, aliases):
+        kind = aliases.get(lookups[0])
+        if kind is None:
+            return None
+        rest = list(lookups[1:])
+        while rest:
+            if kind == 'page' and rest[0] == 'items':
+                kind = 'items'
+            elif kind == 'items' and rest[0].isdigit():
+                kind = 'page'
+            else:
+                break
+            rest.pop(0)
+        return kind, rest
+
+    def add(self, kind, rest, bare_ok=False):
+        if not rest:
+            if not bare_ok:
+                raise _Dynamic
+        elif kind != 'page':
+            raise _Dynamic
+        elif rest[0] == 'meta':
+            if len(rest) > 1 and rest[1] != 'total_count':
+                self.fields.add(rest[1])
+        else:
+            self.fields.add(rest[0])
+
+    def visit_expression(self, expression, aliases, bare_ok=False):
+        if isinstance(expression, Variable):
+            if expression.lookups is not None:
+                resolved = self.resolve(expression.lookups, aliases)
+                if resolved is not None:
+                    self.add(*resolved, bare_ok=bare_ok)
+        elif isinstance(expression, FilterExpression):
+            self.visit_expression(expression.var, aliases, bare_ok=bare_ok and not expression.filters)
+            for func, args in expression.filters:
+                for lookup, arg in args:
+                    if lookup:
+                        self.visit_expression(arg, aliases)
+
+    def visit_value(self, value, aliases, bare_ok=False):
+        if isinstance(value, (FilterExpression, Variable)):
+            self.visit_expression(value, aliases, bare_ok)
+        elif isinstance(value, Node):
+            self.visit_node(value, aliases)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                self.visit_value(item, aliases, bare_ok)
+        elif isinstance(value, dict):
+            for item in value.values():
+                self.visit_value(item, aliases, bare_ok)
+        elif type(value).__module__.startswith('django.template') and hasattr(value, '__dict__'):
+            # Parsed conditions of {% if %}.
+            for item in vars(value).values():
+                self.visit_value(item, aliases, bare_ok)
+
+    def visit_nodelist(self, nodelist, aliases):
+        for node in nodelist:
+            self.visit_node(node, aliases)
+
+    def visit_node(self, node, aliases):
+        if isinstance(node, ForNode):
+            self.visit_for(node, aliases)
+        elif isinstance(node, WithNode):
+            self.visit_with(node, aliases)
+        elif isinstance(node, IfNode):
+            for condition, nodelist in node.conditions_nodelists:
+                self.visit_value(condition, aliases, bare_ok=True)
+                self.visit_nodelist(nodelist, aliases)
+        else:
+            for name, value in vars(node).items():
+                if name in ('token', 'origin'):
+                    continue
+                if isinstance(value, NodeList):
+                    self.visit_nodelist(value, aliases)
+                elif not isinstance(value, dict) or name != 'blocks':
+                    # ExtendsNode.blocks are also found in its nodelist.
+                    self.visit_value(value, aliases)
+
+    def alias(self, expression, aliases):
+        if isinstance(expression, FilterExpression) and isinstance(expression.var, Variable) \
+                and expression.var.lookups is not None:
+            resolved = self.resolve(expression.var.lookups, aliases)
+            if resolved is not None and not resolved[1]:
+                for func, args in expression.filters:
+                    for lookup, arg in args:
+                        if lookup:
+                            self.visit_expression(arg, aliases)
+                return resolved[0]
+        self.visit_expression(expression, aliases)
+        return None
+
+    def visit_for(self, node, aliases):
+        kind = self.alias(node.sequence, aliases)
+        inner = {name: value for name, value in aliases.items() if name not in node.loopvars}
+        if kind == 'items' and len(node.loopvars) == 1:
+            inner[node.loopvars[0]] = 'page'
+        elif kind is not None:
+            raise _Dynamic
+        self.visit_nodelist(node.nodelist_loop, inner)
+        self.visit_nodelist(node.nodelist_empty, aliases)
+
+    def visit_with(self, node, aliases):
+        inner = dict(aliases)
+        for name, expression in node.extra_context.items():
+            kind = self.alias(expression, aliases)
+            if kind is None:
+                inner.pop(name, None)
+            else:
+                inner[name] = kind
+        self.visit_nodelist(node.nodelist, inner)
+
+
+def find_data_fields(content):
+    """
+    Return the sorted names of the fields of ``data`` used by a template,
+    or ``[DYNAMIC]`` if they can't be determined.
+    """
+    try:
+        template = Engine.get_default().from_string(content or '')
+    except TemplateSyntaxError:
+        return [DYNAMIC]
+    finder = DataFieldsFinder()
+    try:
+        finder.visit_nodelist(template.nodelist, {DATA_VARIABLE: 'page'})
+    except _Dynamic:
+        return [DYNAMIC]
+    return sorted(finder.fields)
@@ -1,10 +1,17 @@
+import hashlib
+import threading
+
 from django.conf import settings
-from django.template import Origin, TemplateDoesNotExist
+from django.db.models import Max
+from django.template import Origin, TemplateDoesNotExist, engines
 from django.template.loaders.base import Loader as BaseLoader
 
 from reversion.models import Version
 
-from .models import Template
+from frontend_site.stamps import get_stamp
+
+from .dependencies import DYNAMIC, closure, find_references, parse_references
+from .models import TEMPLATES_STAMP, Template
 
 
 class Loader(BaseLoader):
@@ -39,3 +46,232 @@ class Loader(BaseLoader):
             return self._load_and_store_template(template_name)
         except (Template.MultipleObjectsReturned, Template.DoesNotExist):
             raise TemplateDoesNotExist(template_name)
+
+
+class CachedLoader(Loader):
+    """
+    Keep compiled templates in memory.
+
+    Every template is cached together with its version: ``last_changed``
+    of the published template, or the id of the latest revision in preview
+    mode. The versions of all templates are loaded in one go whenever the
+    ``templates`` stamp changes, and only templates whose version differs
+    are loaded and compiled again. Names that are not in the database are
+    answered without a query, so the next loader is tried at no cost.
+
+    When a template has to be loaded, the templates it extends or includes
+    are fetched along with it: on public sites the whole closure comes from
+    the stored dependency graph in a single query, in preview mode (where
+    drafts may reference other templates) one query per level is needed.
+    The fields of ``data`` used by each template are loaded with the graph,
+    see ``get_data_fields()``.
+    """
+
+    def __init__(self, engine):
+        super(CachedLoader, self).__init__(engine)
+        self._lock = threading.Lock()
+        self._state = None
+        self.template_cache = {}
+        self.source_cache = {}
+
+    def reset(self):
+        with self._lock:
+            self._state = None
+            self.template_cache.clear()
+            self.source_cache.clear()
+
+    def get_state(self):
+        stamp = get_stamp(TEMPLATES_STAMP)
+        state = self._state
+        if state is not None and stamp is not None and stamp == state[0]:
+            return state
+        with self._lock:
+            state = self._state
+            if state is None or stamp is None or stamp != state[0]:
+                versions, graph, data_fields = self.load_versions()
+                # The last item memoizes fingerprints and fields.
+                state = self._state = (stamp, versions, graph, data_fields, {})
+                self.source_cache.clear()
+            return state
+
+    def get_versions(self):
+        return self.get_state()[1]
+
+    def load_versions(self):
+        """
+        Return the version of every template and, on public sites, the
+        dependency graph and the fields of ``data`` used by each template;
+        both are ``None`` in preview mode.
+        """
+        graph = data_fields = None
+        if settings.ALLOW_PREVIEW:
+            latest = Version.objects.get_for_model(Template) \
+                .order_by() \
+                .values_list('object_id') \
+                .annotate(latest=Max('pk'))
+            latest = dict(latest)
+            rows = [
+                (name, latest.get(str(pk)))
+                for pk, name in Template.objects.values_list('pk', 'name')
+            ]
+        else:
+            graph = {}
+            data_fields = {}
+            rows = []
+            queryset = Template.objects.filter(published=True) \
+                .values_list('name', 'last_changed', 'references', 'data_fields')
+            for name, last_changed, references, fields in queryset:
+                rows.append((name, last_changed))
+                graph[name] = parse_references(references)
+                data_fields[name] = parse_references(fields)
+
+        versions = {}
+        duplicates = set()
+        for name, version in rows:
+            if version is None:
+                continue
+            if name in versions:
+                duplicates.add(name)
+            versions[name] = version
+        # Ambiguous names don't resolve, just like in the uncached loader.
+        for name in duplicates:
+            del versions[name]
+        return versions, graph, data_fields
+
+    def load_sources(self, versions, names):
+        if settings.ALLOW_PREVIEW:
+            names_by_version = {versions[name]: name for name in names}
+            queryset = Version.objects.filter(pk__in=names_by_version)
+            return {
+                names_by_version[version.pk]: version._object_version.object.content
+                for version in queryset
+            }
+        else:
+            queryset = Template.objects.filter(published=True, name__in=names) \
+                .values_list('name', 'content')
+            return dict(queryset)
+
+    def prefetch(self, template_name):
+        """
+        Load the source of ``template_name`` and of the templates it depends
+        on that aren't cached yet.
+        """
+        _, versions, graph, _, _ = self.get_state()
+        names = {template_name}
+        seen = set()
+        while names:
+            if graph is not None:
+                names = closure(graph, names)
+            seen |= names
+            missing = [
+                name for name in names
+                if name in versions
+                and not self.is_cached(name, versions[name])
+                and name not in self.source_cache
+            ]
+            sources = self.load_sources(versions, missing) if missing else {}
+            for name, content in sources.items():
+                if name in versions:
+                    self.source_cache[name] = (versions[name], content)
+            if graph is not None:
+                break
+            names = set()
+            for content in sources.values():
+                names.update(find_references(content))
+            names -= seen
+
+    def is_cached(self, template_name, version):
+        cached = self.template_cache.get(template_name)
+        return cached is not None and cached[0] == version
+
+    def get_contents(self, origin):
+        version = self.get_versions().get(origin.template_name)
+        cached = self.source_cache.pop(origin.template_name, None)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        return super(CachedLoader, self).get_contents(origin)
+
+    def get_template(self, template_name, skip=None):
+        origin = Origin(
+            name=template_name,
+            template_name=template_name,
+            loader=self,
+        )
+        if skip is not None and origin in skip:
+            raise TemplateDoesNotExist(template_name, tried=[(origin, 'Skipped')])
+
+        version = self.get_versions().get(template_name)
+        if version is None:
+            raise TemplateDoesNotExist(template_name, tried=[(origin, 'Source does not exist')])
+
+        if self.is_cached(template_name, version):
+            return self.template_cache[template_name][1]
+
+        if template_name not in self.source_cache:
+            self.prefetch(template_name)
+        template = super(CachedLoader, self).get_template(template_name, skip)
+        self.template_cache[template_name] = (version, template)
+        return template
+
+    def get_fingerprint(self, template_name):
+        """
+        Return a token that changes whenever ``template_name`` or any
+        template it depends on changes. Without a dependency graph, or when
+        a template references others dynamically, fall back to the stamp
+        that changes with every template.
+        """
+        stamp, versions, graph, _, memo = self.get_state()
+        fingerprint = memo.get(('fingerprint', template_name))
+        if fingerprint is not None:
+            return fingerprint
+        names = closure(graph, [template_name]) if graph is not None else {DYNAMIC}
+        if DYNAMIC in names:
+            fingerprint = str(stamp)
+        else:
+            source = repr(sorted((name, str(versions.get(name))) for name in names))
+            fingerprint = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        memo[('fingerprint', template_name)] = fingerprint
+        return fingerprint
+
+    def get_data_fields(self, template_name):
+        """
+        Return the sorted fields of ``data`` used by ``template_name`` and
+        the templates it depends on, or ``None`` if they are unknown.
+        """
+        _, versions, graph, data_fields, memo = self.get_state()
+        key = ('data_fields', template_name)
+        if key in memo:
+            return memo[key]
+        fields = None
+        if graph is not None and template_name in versions:
+            names = closure(graph, [template_name])
+            # Dynamic references and templates from other loaders aren't
+            # in the graph.
+            if all(name in data_fields for name in names):
+                used = set().union(*(data_fields[name] for name in names))
+                if DYNAMIC not in used:
+                    fields = sorted(used)
+        memo[key] = fields
+        return fields
+
+
+def get_cached_loader():
+    for engine in engines.all():
+        for loader in getattr(getattr(engine, 'engine', None), 'template_loaders', []):
+            if isinstance(loader, CachedLoader):
+                return loader
+    return None
+
+
+def get_template_fingerprint(template_name):
+    loader = get_cached_loader()
+    if loader is None:
+        return str(get_stamp(TEMPLATES_STAMP))
+    return loader.get_fingerprint(template_name)
+
+
+def get_template_data_fields(template_name):
+    loader = get_cached_loader()
+    if loader is None:
+        return None
+    return loader.get_data_fields(template_name)
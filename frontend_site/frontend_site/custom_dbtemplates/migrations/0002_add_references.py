@@ -0,0 +1,28 @@
+# Generated by Django 3.0.10 on 2026-10-17 17:24
+
+from django.db import migrations, models
+
+from frontend_site.custom_dbtemplates.dependencies import find_references, format_references
+
+
+def update_references(apps, schema_editor):
+    Template = apps.get_model('custom_dbtemplates', 'Template')
+    for template in Template.objects.all():
+        template.references = format_references(find_references(template.content))
+        template.save(update_fields=['references'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_dbtemplates', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='template',
+            name='references',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Templates extended or included by this one, one per line.', verbose_name='references'),
+        ),
+        migrations.RunPython(update_references, migrations.RunPython.noop),
+    ]
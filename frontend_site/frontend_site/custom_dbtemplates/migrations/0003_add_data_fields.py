@@ -0,0 +1,28 @@
+# Generated by Django 3.0.10 on 2026-10-17 17:33
+
+from django.db import migrations, models
+
+from frontend_site.custom_dbtemplates.dependencies import find_data_fields, format_references
+
+
+def update_data_fields(apps, schema_editor):
+    Template = apps.get_model('custom_dbtemplates', 'Template')
+    for template in Template.objects.all():
+        template.data_fields = format_references(find_data_fields(template.content))
+        template.save(update_fields=['data_fields'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_dbtemplates', '0002_add_references'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='template',
+            name='data_fields',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Fields of the data variable used by this template, one per line.', verbose_name='data fields'),
+        ),
+        migrations.RunPython(update_data_fields, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,18 @@
-from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 from django.utils.timezone import now
 
+from reversion.signals import post_revision_commit
+
+from frontend_site.stamps import bump_stamp
+
+from .dependencies import find_data_fields, find_references, format_references
+
+TEMPLATES_STAMP = 'templates'
+
 
 # clone of dbtemplates.models.Template
 class Template(models.Model):
@@ -11,6 +22,10 @@ class Template(models.Model):
     creation_date = models.DateTimeField(_('creation date'), default=now)
     last_changed = models.DateTimeField(_('last changed'), default=now)
     published = models.BooleanField(null=True, default=False)
+    references = models.TextField(_('references'), blank=True, default='', editable=False,
+                                  help_text=_('Templates extended or included by this one, one per line.'))
+    data_fields = models.TextField(_('data fields'), blank=True, default='', editable=False,
+                                   help_text=_('Fields of the data variable used by this template, one per line.'))
 
     objects = models.Manager()
 
@@ -26,3 +41,26 @@ class Template(models.Model):
     def save(self, *args, **kwargs):
         self.last_changed = now()
         super(Template, self).save(*args, **kwargs)
+
+
+@receiver(pre_save, sender=Template)
+def update_references(sender, instance, **kwargs):
+    # Also runs for fixtures, which don't go through Template.save().
+    instance.references = format_references(find_references(instance.content))
+    instance.data_fields = format_references(find_data_fields(instance.content))
+
+
+@receiver(post_save, sender=Template)
+@receiver(post_delete, sender=Template)
+def invalidate_templates(sender, **kwargs):
+    bump_stamp(TEMPLATES_STAMP)
+    transaction.on_commit(lambda: bump_stamp(TEMPLATES_STAMP))
+
+
+@receiver(post_revision_commit)
+def invalidate_template_revisions(sender, revision, versions, **kwargs):
+    # Drafts only exist as revisions; preview sites need to see them.
+    content_type = ContentType.objects.get_for_model(Template)
+    if any(version.content_type_id == content_type.pk for version in versions):
+        bump_stamp(TEMPLATES_STAMP)
+        transaction.on_commit(lambda: bump_stamp(TEMPLATES_STAMP))
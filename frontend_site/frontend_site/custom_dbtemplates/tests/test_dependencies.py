@@ -0,0 +1,156 @@
+from django.core.cache import cache
+from django.template import Context, engines
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import reversion
+
+from frontend_site.custom_dbtemplates.dependencies import DYNAMIC, closure, find_data_fields, find_references
+from frontend_site.custom_dbtemplates.loader import get_template_data_fields, get_template_fingerprint
+from frontend_site.custom_dbtemplates.models import Template
+
+PAGE = '''{% extends "base.html" %}
+{% block content %}{% include 'header.html' %}{% include "header.html" %}body{% endblock %}
+'''
+BASE = '''<html>{% include "nav.html" with active=1 %}{% block content %}{% endblock %}</html>'''
+
+
+class FindReferencesTests(SimpleTestCase):
+    def test_find_references(self):
+        self.assertEqual(find_references(PAGE), ['base.html', 'header.html'])
+        self.assertEqual(find_references(BASE), ['nav.html'])
+        self.assertEqual(find_references('{% include name %}'), [DYNAMIC])
+        self.assertEqual(find_references('{# {% include "x.html" %} #}'), [])
+        self.assertEqual(find_references(''), [])
+
+    def test_closure(self):
+        graph = {'a': ['b', 'c'], 'b': ['d'], 'd': ['a']}
+        self.assertEqual(closure(graph, ['a']), {'a', 'b', 'c', 'd'})
+        self.assertEqual(closure(graph, ['c']), {'c'})
+
+
+class FindDataFieldsTests(SimpleTestCase):
+    def test_page(self):
+        content = '''
+            {% if data.date_published %}{{ data.date_published }}{% endif %}
+            <h1>{{ data.title|upper }}</h1>{{ data.body|default:data.meta.search_description }}
+            {% with image=data.image %}{{ image.url }}{% endwith %}
+        '''
+        self.assertEqual(find_data_fields(content), ['body', 'date_published', 'image', 'search_description', 'title'])
+
+    def test_listing(self):
+        content = '''
+            {% load routes %}
+            {{ data.meta.total_count }}
+            {% if data.items %}
+                {% for page in data.items %}
+                    <a href="{% route_url 'blog_detail' page.id %}">{{ page.title }}</a>{{ page.meta.slug }}
+                {% endfor %}
+            {% endif %}
+            {% with posts=data.items %}{% for post in posts reversed %}{{ post.subtitle }}{% endfor %}{% endwith %}
+            {{ data.items.0.body }}
+        '''
+        self.assertEqual(find_data_fields(content), ['body', 'id', 'slug', 'subtitle', 'title'])
+
+    def test_other_variables(self):
+        content = '{{ title }}{% for data in pages %}{{ data }}{% endfor %}{% with data=other %}{{ data }}{% endwith %}'
+        self.assertEqual(find_data_fields(content), [])
+
+    def test_dynamic(self):
+        for content in [
+            '{{ data }}',
+            '{{ data.items|length }}',
+            '{% include "page.html" with page=data %}',
+            '{% for page in data.items %}{{ page }}{% endfor %}',
+            '{% for key, value in data.items %}{% endfor %}',
+            '{% if data.title %}',
+        ]:
+            with self.subTest(content=content):
+                self.assertEqual(find_data_fields(content), [DYNAMIC])
+
+
+class DependencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.engine = engines['django'].engine
+
+    def create_templates(self):
+        templates = {}
+        for name, content in [
+            ('page.html', PAGE),
+            ('base.html', BASE),
+            ('header.html', '<h1>header</h1>'),
+            ('nav.html', '<nav>{{ active }}</nav>'),
+            ('other.html', 'other'),
+        ]:
+            with reversion.revisions.create_revision(manage_manually=True):
+                obj = Template.objects.create(name=name, content=content, published=True)
+                reversion.revisions.add_to_revision(obj)
+            templates[name] = obj
+        return templates
+
+    def render(self, name):
+        return self.engine.get_template(name).render(Context())
+
+    def test_references_saved(self):
+        templates = self.create_templates()
+        self.assertEqual(templates['page.html'].references, 'base.html\nheader.html')
+        self.assertEqual(Template.objects.get(name='other.html').references, '')
+
+    def test_prefetch(self):
+        self.create_templates()
+        # One query for the versions, one for all four sources.
+        with self.assertNumQueries(2):
+            output = self.render('page.html')
+        self.assertEqual(output.strip(), '<html><nav>1</nav><h1>header</h1><h1>header</h1>body</html>')
+        with self.assertNumQueries(0):
+            self.render('page.html')
+
+    @override_settings(ALLOW_PREVIEW=True)
+    def test_prefetch_preview(self):
+        self.create_templates()
+        # Two queries for the versions, then one per level of the graph.
+        with self.assertNumQueries(5):
+            self.render('page.html')
+        with self.assertNumQueries(0):
+            self.render('page.html')
+
+    def test_fingerprint(self):
+        templates = self.create_templates()
+        page = get_template_fingerprint('page.html')
+        base = get_template_fingerprint('base.html')
+
+        templates['other.html'].save()
+        self.assertEqual(get_template_fingerprint('page.html'), page)
+
+        # Republishing a template changes the fingerprints of its dependents.
+        templates['nav.html'].save()
+        self.assertNotEqual(get_template_fingerprint('page.html'), page)
+        self.assertNotEqual(get_template_fingerprint('base.html'), base)
+
+    def test_data_fields(self):
+        templates = self.create_templates()
+        self.assertEqual(templates['nav.html'].data_fields, '')
+        templates['header.html'].content = '<h1>{{ data.title }}</h1>'
+        templates['header.html'].save()
+        templates['page.html'].content = PAGE + '{{ data.body }}'
+        templates['page.html'].save()
+        self.assertEqual(get_template_data_fields('page.html'), ['body', 'title'])
+        self.assertEqual(get_template_data_fields('base.html'), [])
+        self.assertIsNone(get_template_data_fields('missing.html'))
+
+        templates['nav.html'].content = '{{ data }}'
+        templates['nav.html'].save()
+        self.assertIsNone(get_template_data_fields('page.html'))
+
+    @override_settings(ALLOW_PREVIEW=True)
+    def test_data_fields_preview(self):
+        self.create_templates()
+        self.assertIsNone(get_template_data_fields('page.html'))
+
+    def test_fingerprint_dynamic(self):
+        templates = self.create_templates()
+        templates['header.html'].content = '{% include name %}'
+        templates['header.html'].save()
+        page = get_template_fingerprint('page.html')
+        templates['other.html'].save()
+        self.assertNotEqual(get_template_fingerprint('page.html'), page)
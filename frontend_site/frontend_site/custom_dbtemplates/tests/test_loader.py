@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.template import Context, TemplateDoesNotExist, engines
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+
+import reversion
+
+from frontend_site.custom_dbtemplates.models import TEMPLATES_STAMP, Template
+from frontend_site.stamps import bump_stamp
+
+
+class CachedLoaderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.engine = engines['django'].engine
+
+    def get_template(self, name):
+        return self.engine.get_template(name)
+
+    def test_cached(self):
+        Template.objects.create(name='page.html', content='v1', published=True)
+        template = self.get_template('page.html')
+        self.assertEqual(template.render(Context()), 'v1')
+        with self.assertNumQueries(0):
+            self.assertIs(self.get_template('page.html'), template)
+
+    def test_missing(self):
+        Template.objects.create(name='page.html', content='v1', published=True)
+        self.get_template('page.html')
+        with self.assertNumQueries(0):
+            with self.assertRaises(TemplateDoesNotExist):
+                self.get_template('missing.html')
+
+    def test_unpublished(self):
+        Template.objects.create(name='page.html', content='v1', published=False)
+        with self.assertRaises(TemplateDoesNotExist):
+            self.get_template('page.html')
+
+    def test_invalidate_on_save(self):
+        obj = Template.objects.create(name='page.html', content='v1', published=True)
+        other = Template.objects.create(name='other.html', content='other', published=True)
+        template = self.get_template('page.html')
+        other_template = self.get_template('other.html')
+        obj.content = 'v2'
+        obj.save()
+        self.assertEqual(self.get_template('page.html').render(Context()), 'v2')
+        # Templates that did not change are not compiled again.
+        self.assertIsNot(self.get_template('page.html'), template)
+        self.assertIs(self.get_template('other.html'), other_template)
+        other.delete()
+        with self.assertRaises(TemplateDoesNotExist):
+            self.get_template('other.html')
+
+    def test_stamp_shared_between_processes(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        stamps = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }
+        with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}, 'stamps': stamps}):
+            obj = Template.objects.create(name='page.html', content='v1', published=True)
+            self.assertEqual(self.get_template('page.html').render(Context()), 'v1')
+
+            # Another process, e.g. the public site when this is the preview
+            # one, saves the template with its own cache instance.
+            Template.objects.filter(pk=obj.pk).update(content='v2', last_changed=now())
+            self.assertEqual(self.get_template('page.html').render(Context()), 'v1')
+            other = FileBasedCache(location, {})
+            with mock.patch('frontend_site.stamps._get_cache', return_value=other):
+                bump_stamp(TEMPLATES_STAMP)
+            self.assertEqual(self.get_template('page.html').render(Context()), 'v2')
+
+    @override_settings(ALLOW_PREVIEW=True)
+    def test_preview(self):
+        with reversion.revisions.create_revision(manage_manually=True):
+            obj = Template.objects.create(name='page.html', content='v1', published=True)
+            reversion.revisions.add_to_revision(obj)
+        self.assertEqual(self.get_template('page.html').render(Context()), 'v1')
+        with self.assertNumQueries(0):
+            self.get_template('page.html')
+
+        # Save a draft as the admin does: only a new revision is created.
+        with reversion.revisions.create_revision(manage_manually=True):
+            obj.content = 'draft'
+            reversion.revisions.add_to_revision(obj)
+        self.assertEqual(self.get_template('page.html').render(Context()), 'draft')
@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib import admin
 
-from .models import Route
+from .models import Route, RouteDataSource
 
 
 class RouteForm(forms.ModelForm):
@@ -10,15 +10,34 @@ class RouteForm(forms.ModelForm):
     endpoint = forms.CharField(widget=forms.TextInput(attrs={'size': '80'}), required=False)
     template_name = forms.CharField(widget=forms.TextInput(attrs={'size': '40'}))
     content_type = forms.CharField(widget=forms.TextInput(attrs={'size': '40'}))
+    fields = forms.CharField(widget=forms.TextInput(attrs={'size': '80'}), required=False)
 
     class Meta:
         model = Route
         fields = '__all__'
 
 
+class RouteDataSourceForm(forms.ModelForm):
+    endpoint = forms.CharField(widget=forms.TextInput(attrs={'size': '60'}))
+    fields = forms.CharField(widget=forms.TextInput(attrs={'size': '30'}), required=False)
+    params = forms.CharField(widget=forms.TextInput(attrs={'size': '60'}), required=False)
+
+    class Meta:
+        model = RouteDataSource
+        fields = '__all__'
+
+
+class RouteDataSourceInline(admin.TabularInline):
+    model = RouteDataSource
+    form = RouteDataSourceForm
+    extra = 0
+    ordering = ['order']
+
+
 @admin.register(Route)
 class RouteAdmin(admin.ModelAdmin):
     form = RouteForm
+    inlines = [RouteDataSourceInline]
 
     list_display = ['id', 'order', 'name', 'path', 'endpoint', 'template_name', 'content_type']
     list_editable = ['order']
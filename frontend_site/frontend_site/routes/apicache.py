@@ -0,0 +1,245 @@
+"""
+Cache for JSON fetched from the backend API.
+
+Responses are kept in two tiers: a bounded LRU in this process holding the
+decoded data, and a shared tier in a Django cache. The freshness lifetime
+comes from the backend's ``Cache-Control`` header (``TIMEOUT`` when there
+is none). Stale entries that carry an ``ETag`` are revalidated with
+``If-None-Match``. Options are read from ``settings.API_CACHE``:
+
+``ENABLED``
+    Set to ``False`` to always fetch from the backend.
+``TIMEOUT``
+    Freshness lifetime in seconds for responses without ``max-age``.
+``STALE_TIMEOUT``
+    How long stale entries with an ``ETag`` are kept for revalidation.
+``MAX_ENTRIES``
+    Size of the in-process LRU.
+``CACHE_ALIAS``
+    Django cache used as the shared tier, or ``None``.
+
+Keys include the ``backend-data`` stamp, which is bumped when the backend
+reports that published pages changed, see ``invalidate_backend_data()``.
+
+Preview sites never use the cache, so drafts cannot leak into it.
+"""
+import hashlib
+import operator
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from frontend_site.stamps import bump_stamp, get_stamp
+
+from .client import get_client
+
+BACKEND_DATA_STAMP = 'backend-data'
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TIMEOUT': 60,
+    'STALE_TIMEOUT': 3600,
+    'MAX_ENTRIES': 1000,
+    'CACHE_ALIAS': 'default',
+}
+
+
+class CacheEntry(object):
+    __slots__ = ('data', 'etag', 'expires')
+
+    def __init__(self, data, etag, expires):
+        self.data = data
+        self.etag = etag
+        self.expires = expires
+
+    def __getstate__(self):
+        return (self.data, self.etag, self.expires)
+
+    def __setstate__(self, state):
+        self.data, self.etag, self.expires = state
+
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"')
+    return directives
+
+
+class LRUCache(object):
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class APICache(object):
+    key_prefix = 'apicache'
+
+    def __init__(self, options=None):
+        self.options = dict(DEFAULTS, **(options or {}))
+        self.local = LRUCache(self.options['MAX_ENTRIES'])
+
+    @property
+    def shared(self):
+        alias = self.options['CACHE_ALIAS']
+        return caches[alias] if alias else None
+
+    def make_key(self, url, params):
+        if isinstance(params, dict):
+            params = params.items()
+        # Keep the order of repeated parameters.
+        query = urlencode(sorted(params or (), key=operator.itemgetter(0)))
+        stamp = get_stamp(BACKEND_DATA_STAMP)
+        digest = hashlib.sha1(f'{stamp}:{url}?{query}'.encode('utf-8')).hexdigest()
+        return f'{self.key_prefix}:{digest}'
+
+    def get_entry(self, key):
+        entry = self.local.get(key)
+        if entry is None and self.shared is not None:
+            entry = self.shared.get(key)
+            if entry is not None:
+                self.local.set(key, entry)
+        return entry
+
+    def set_entry(self, key, entry, now):
+        self.local.set(key, entry)
+        if self.shared is not None:
+            timeout = entry.expires - now
+            if entry.etag:
+                timeout += self.options['STALE_TIMEOUT']
+            self.shared.set(key, entry, timeout=max(int(timeout), 1))
+
+    def delete_entry(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def get_lifetime(self, response):
+        """
+        Return how many seconds ``response`` may be served from the cache,
+        or ``None`` when it must not be stored at all.
+        """
+        directives = parse_cache_control(response.headers.get('Cache-Control'))
+        if 'no-store' in directives or 'private' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0
+        for name in ('s-maxage', 'max-age'):
+            if name in directives:
+                try:
+                    return max(int(directives[name]), 0)
+                except ValueError:
+                    return 0
+        return self.options['TIMEOUT']
+
+    def fetch(self, url, params=None):
+        """
+        Return the decoded JSON for ``url``. Raise ``requests.HTTPError``
+        for error responses, which are never cached.
+        """
+        if not self.options['ENABLED']:
+            return self.fetch_uncached(url, params)
+
+        key = self.make_key(url, params)
+        now = time.time()
+        entry = self.get_entry(key)
+        if entry is not None and entry.expires > now:
+            return entry.data
+
+        headers = {}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        r = get_client().get(url, params=params, headers=headers)
+
+        if r.status_code == 304 and entry is not None:
+            data = entry.data
+            etag = r.headers.get('ETag', entry.etag)
+        else:
+            r.raise_for_status()
+            data = r.json()
+            etag = r.headers.get('ETag')
+
+        lifetime = self.get_lifetime(r)
+        if lifetime is None or (lifetime == 0 and not etag):
+            self.delete_entry(key)
+        else:
+            self.set_entry(key, CacheEntry(data, etag, now + lifetime), now)
+        return data
+
+    def fetch_uncached(self, url, params=None):
+        r = get_client().get(url, params=params)
+        r.raise_for_status()
+        return r.json()
+
+    def clear(self):
+        self.local.clear()
+
+
+_api_cache = None
+_api_cache_lock = threading.Lock()
+
+
+def get_api_cache():
+    global _api_cache
+    if _api_cache is None:
+        with _api_cache_lock:
+            if _api_cache is None:
+                _api_cache = APICache(getattr(settings, 'API_CACHE', None))
+    return _api_cache
+
+
+@receiver(setting_changed)
+def reset_api_cache(setting, **kwargs):
+    global _api_cache
+    if setting == 'API_CACHE':
+        with _api_cache_lock:
+            _api_cache = None
+
+
+def fetch_json(url, params=None, allow_preview=False):
+    if allow_preview:
+        return get_api_cache().fetch_uncached(url, params)
+    return get_api_cache().fetch(url, params)
+
+
+def invalidate_backend_data(events):
+    """
+    Forget everything fetched from the backend if any of ``events`` (as sent
+    by the backend's change notifications) affects published pages.
+    """
+    if any(not event.get('draft') for event in events):
+        bump_stamp(BACKEND_DATA_STAMP)
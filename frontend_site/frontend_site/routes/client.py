@@ -0,0 +1,149 @@
+"""
+HTTP client for the backend API.
+
+Connections are pooled per backend host and kept alive between page
+renders. Options are read from ``settings.BACKEND_CLIENT``:
+
+``TIMEOUT``
+    ``(connect, read)`` timeouts in seconds.
+``RETRIES``, ``BACKOFF_FACTOR``, ``STATUS_FORCELIST``
+    Retries of failed GET requests, see ``urllib3.util.retry.Retry``.
+``POOL_MAXSIZE``, ``POOL_BLOCK``
+    Maximum number of connections kept per host, and whether to wait for
+    a free connection instead of opening an extra one.
+``MAX_WORKERS``
+    Number of threads fetching the data sources of a page concurrently;
+    ``1`` fetches them one after the other.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULTS = {
+    'TIMEOUT': (3.05, 30),
+    'RETRIES': 2,
+    'BACKOFF_FACTOR': 0.1,
+    'STATUS_FORCELIST': (502, 503, 504),
+    'POOL_MAXSIZE': 32,
+    'POOL_BLOCK': False,
+    'MAX_WORKERS': 32,
+}
+
+
+class BackendClient(object):
+    def __init__(self, options=None):
+        self.options = dict(DEFAULTS, **(options or {}))
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._executor = None
+
+    def create_session(self):
+        options = self.options
+        retry = Retry(
+            total=options['RETRIES'],
+            backoff_factor=options['BACKOFF_FACTOR'],
+            status_forcelist=options['STATUS_FORCELIST'],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=options['POOL_MAXSIZE'],
+            pool_block=options['POOL_BLOCK'],
+            max_retries=retry,
+        )
+        session = requests.Session()
+        # The session is shared by all requests of this process; never let
+        # a cookie set by the backend leak from one page view into another.
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get_session(self, url):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        session = self._sessions.get(key)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    session = self._sessions[key] = self.create_session()
+        return session
+
+    def get(self, url, params=None, **kwargs):
+        kwargs.setdefault('timeout', self.options['TIMEOUT'])
+        return self.get_session(url).get(url, params=params, **kwargs)
+
+    @property
+    def executor(self):
+        """
+        Thread pool for concurrent requests, or ``None`` if disabled.
+        """
+        if self.options['MAX_WORKERS'] <= 1:
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.options['MAX_WORKERS'],
+                        thread_name_prefix='backend-client')
+        return self._executor
+
+    def call_many(self, funcs):
+        """
+        Call ``funcs`` concurrently on the executor and return their results
+        in order. If any of them fails, the error of the first one in the
+        list is raised, once all of them are done.
+        """
+        executor = self.executor
+        if executor is None or len(funcs) < 2:
+            return [func() for func in funcs]
+        # The calling thread runs the first one itself.
+        futures = [executor.submit(func) for func in funcs[1:]]
+        try:
+            first = funcs[0]()
+        finally:
+            # Callers clean up after all of them when one fails.
+            wait(futures)
+        return [first] + [future.result() for future in futures]
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for session in sessions.values():
+            session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = BackendClient(getattr(settings, 'BACKEND_CLIENT', None))
+    return _client
+
+
+@receiver(setting_changed)
+def reset_client(setting, **kwargs):
+    global _client
+    if setting == 'BACKEND_CLIENT':
+        with _client_lock:
+            client, _client = _client, None
+        if client is not None:
+            client.close()
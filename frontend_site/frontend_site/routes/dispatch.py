@@ -0,0 +1,80 @@
+import heapq
+
+from django.urls.resolvers import _PATH_PARAMETER_COMPONENT_RE
+
+
+class LinearDispatcher(object):
+    """
+    Try every route in order.
+    """
+
+    def __init__(self, routes):
+        self.routes = list(routes)
+
+    def match(self, path):
+        for route in self.routes:
+            m = route.match(path)
+            if m is not None:
+                return m
+        return None
+
+
+class _TrieNode(object):
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []
+
+
+def literal_segments(route_path):
+    """
+    Return the complete path segments that every path matched by
+    ``route_path`` has to start with.
+
+    For example, ``'blog/<slug>/'`` returns ``['blog']`` and
+    ``'blog/archive-<int:year>/'`` returns ``['blog']`` as well, because
+    the partial ``archive-`` segment cannot be used as a key.
+    """
+    m = _PATH_PARAMETER_COMPONENT_RE.search(route_path)
+    literal = route_path if m is None else route_path[:m.start()]
+    return literal.split('/')[:-1]
+
+
+class TrieDispatcher(object):
+    """
+    Index routes by their literal leading path segments.
+
+    A route can only match paths that start with its literal prefix, so
+    only the routes stored along the request path's segments in the trie
+    need to be tried. Candidates are tried in their original order, which
+    keeps the precedence of a linear scan.
+    """
+
+    def __init__(self, routes):
+        self.root = _TrieNode()
+        for index, route in enumerate(routes):
+            node = self.root
+            for segment in literal_segments(route.path):
+                node = node.children.setdefault(segment, _TrieNode())
+            node.entries.append((index, route))
+
+    def candidates(self, path):
+        node = self.root
+        lists = [node.entries]
+        for segment in path.split('/')[:-1]:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.entries:
+                lists.append(node.entries)
+        if len(lists) == 1:
+            return lists[0]
+        return heapq.merge(*lists, key=lambda entry: entry[0])
+
+    def match(self, path):
+        for index, route in self.candidates(path):
+            m = route.match(path)
+            if m is not None:
+                return m
+        return None
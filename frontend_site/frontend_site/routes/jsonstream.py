@@ -0,0 +1,259 @@
+"""
+Lazy decoding of JSON objects read from a stream.
+
+``open_json_stream()`` returns the backend's response as a ``LazyObject``
+that reads the body from the socket as its members are looked up. The
+``items`` array of a listing becomes ``LazyItems``, which decodes one item
+at a time while it is iterated, so the whole list of items never exists
+as Python objects at once.
+
+``{% for %}`` asks for the length of a sequence before looping over it;
+``LazyItems`` answers by reading ahead. Items are kept as JSON text once
+read, which is still much smaller than the decoded objects, so they can be
+looped over, counted and indexed any number of times.
+
+Names starting with an underscore are not reachable from templates, so
+everything but the lookups is kept private.
+"""
+import json
+
+from .client import get_client
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = ' \t\n\r'
+
+
+class JSONStream(object):
+    """
+    Read JSON tokens and values from an iterable of text chunks.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size=1):
+        """
+        Read chunks until at least ``size`` more characters are buffered.
+        Return ``False`` at the end of the stream.
+        """
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        target = len(self._buffer) + size
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while length < target:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                break
+            parts.append(chunk)
+            length += len(chunk)
+        self._buffer = ''.join(parts)
+        return length > len(parts[0])
+
+    def peek(self):
+        """
+        Return the next non-whitespace character, or ``''`` at the end.
+        """
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if self._eof or not self._fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f'Expected {chars!r} at {char!r}')
+        self._pos += 1
+        return char
+
+    def read(self):
+        """
+        Return the next value, decoded.
+        """
+        return self._next_value()[0]
+
+    def read_raw(self):
+        """
+        Return the text of the next value.
+        """
+        _, start, end = self._next_value()
+        return self._buffer[start:end]
+
+    def read_with_raw(self):
+        """
+        Return the next value, decoded, and its text.
+        """
+        value, start, end = self._next_value()
+        return value, self._buffer[start:end]
+
+    def _next_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                # Read at least as much again as the partial value.
+                self._fill(max(len(self._buffer) - self._pos, CHUNK_SIZE))
+                continue
+            # A number may go on in the next chunk.
+            if end < len(self._buffer) or self._eof:
+                start, self._pos = self._pos, end
+                return value, start, end
+            self._fill()
+
+
+class LazyObject(object):
+    """
+    A JSON object whose members are decoded as they are looked up.
+    """
+
+    def __init__(self, stream, closer=None):
+        self._stream = stream
+        self._closer = closer
+        self._members = {}
+        self._items = None
+        self._done = False
+        stream.expect('{')
+
+    def _next_member(self):
+        stream = self._stream
+        if self._items is not None:
+            # Keep the items that weren't read yet before moving on.
+            self._items._read_ahead()
+            self._items = None
+        if self._members:
+            end = stream.expect(',}') == '}'
+        else:
+            end = stream.peek() == '}'
+            if end:
+                stream.expect('}')
+        if end:
+            self._done = True
+            return None
+        key = stream.read()
+        stream.expect(':')
+        if key == 'items' and stream.peek() == '[':
+            value = self._items = LazyItems(stream)
+        else:
+            value = stream.read()
+        self._members[key] = value
+        return key
+
+    def __getitem__(self, key):
+        if key in self._members:
+            return self._members[key]
+        while not self._done:
+            if self._next_member() == key:
+                return self._members[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __bool__(self):
+        return True
+
+    def _close(self):
+        if self._closer is not None:
+            self._closer()
+            self._closer = None
+
+
+class LazyItems(object):
+    """
+    The ``items`` of a listing, decoded one by one as they are iterated.
+
+    The text of the items read so far is kept, so iterating again decodes
+    them anew. Their length and indexing read the remaining items ahead.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._texts = []
+        stream.expect('[')
+        self._done = stream.peek() == ']'
+        if self._done:
+            stream.expect(']')
+
+    def _read_next(self, decode):
+        stream = self._stream
+        if decode:
+            value, raw = stream.read_with_raw()
+        else:
+            value, raw = None, stream.read_raw()
+        self._texts.append(raw)
+        if stream.expect(',]') == ']':
+            self._done = True
+        return value
+
+    def _read_ahead(self, count=None):
+        while not self._done and (count is None or len(self._texts) < count):
+            self._read_next(decode=False)
+
+    def __iter__(self):
+        index = 0
+        while True:
+            if index < len(self._texts):
+                yield json.loads(self._texts[index])
+            elif not self._done:
+                yield self._read_next(decode=True)
+            else:
+                return
+            index += 1
+
+    def __reversed__(self):
+        self._read_ahead()
+        return (json.loads(raw) for raw in reversed(self._texts))
+
+    def __len__(self):
+        self._read_ahead()
+        return len(self._texts)
+
+    def __bool__(self):
+        return bool(self._texts) or not self._done
+
+    def __getitem__(self, index):
+        if not isinstance(index, int) or index < 0:
+            raise TypeError('Lazy items can only be indexed by non-negative integers.')
+        self._read_ahead(index + 1)
+        if index >= len(self._texts):
+            raise IndexError(index)
+        return json.loads(self._texts[index])
+
+
+def open_json_stream(url, params=None):
+    """
+    Request ``url`` and return the body as a ``LazyObject`` (or, if it isn't
+    an object, decoded as a whole). The connection is held until
+    ``_close()`` is called. Raise ``requests.HTTPError`` for error responses.
+    """
+    r = get_client().get(url, params=params, stream=True)
+    try:
+        r.raise_for_status()
+        r.encoding = r.encoding or 'utf-8'
+        stream = JSONStream(r.iter_content(chunk_size=CHUNK_SIZE, decode_unicode=True))
+        if stream.peek() != '{':
+            value = stream.read()
+            r.close()
+            return value
+        return LazyObject(stream, closer=r.close)
+    except BaseException:
+        r.close()
+        raise
@@ -0,0 +1,52 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+
+import requests
+
+from frontend_site.routes.client import BackendClient
+from frontend_site.routes.stub import StubBackend, StubResponse
+
+
+class Command(BaseCommand):
+    help = 'Compare one-off requests with the pooled backend client.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=500, dest='count',
+            help='Number of requests per run.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Number of runs; the best one is reported.',
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        data = {
+            'meta': {'total_count': 1},
+            'items': [{'id': 1, 'title': 'Hello'}],
+        }
+        responses = {'/api/v1/pages/': StubResponse(data)}
+        with StubBackend(responses) as backend:
+            url = backend.url('/api/v1/pages/')
+            params = {'fields': '*'}
+            client = BackendClient()
+            methods = [
+                ('requests.get', lambda: requests.get(url, params=params)),
+                ('pooled', lambda: client.get(url, params=params)),
+            ]
+            self.stdout.write(f'{count} requests against {backend.base_url}')
+            for name, func in methods:
+                connections = backend.connections
+
+                def run():
+                    for _ in range(count):
+                        func().json()
+                best = min(timeit.repeat(run, number=1, repeat=options['repeat']))
+                opened = backend.connections - connections
+                total = count * options['repeat']
+                self.stdout.write(
+                    f'  {name:<14} {best / count * 1e6:10.1f} us/request,'
+                    f' {opened} connections for {total} requests')
+            client.close()
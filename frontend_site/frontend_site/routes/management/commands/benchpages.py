@@ -0,0 +1,138 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+
+from frontend_site.custom_dbtemplates.models import Template
+from frontend_site.routes.models import Route, RouteDataSource
+from frontend_site.routes.stub import StubBackend, StubResponse
+
+TEMPLATE_NAME = 'benchpages.html'
+ROUTE_NAME = 'benchpages'
+
+
+class Command(BaseCommand):
+    help = 'Load test a page with several data sources under WSGI and ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=200, dest='count',
+            help='Number of page views per run.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=20,
+            help='Number of page views in flight at once.',
+        )
+        parser.add_argument(
+            '--sources', type=int, default=3,
+            help='Number of data sources of the page, besides its endpoint.',
+        )
+        parser.add_argument(
+            '--delay', type=float, default=0.05,
+            help='Response time of the backend, in seconds.',
+        )
+
+    def handle(self, *args, **options):
+        names = [f'source{i}' for i in range(options['sources'])]
+        responses = {f'/api/v1/{name}/': StubResponse({'title': name}) for name in ['page'] + names}
+        with StubBackend(responses, delay=options['delay']) as backend:
+            Template.objects.filter(name=TEMPLATE_NAME).delete()
+            Route.objects.filter(name=ROUTE_NAME).delete()
+            Template.objects.create(
+                name=TEMPLATE_NAME, published=True,
+                content=''.join(f'{{{{ {name}.title }}}}' for name in ['data'] + names))
+            route = Route.objects.create(
+                order=-1, name=ROUTE_NAME, path=f'{ROUTE_NAME}/',
+                endpoint=backend.url('/api/v1/page/'), template_name=TEMPLATE_NAME)
+            for order, name in enumerate(names):
+                RouteDataSource.objects.create(
+                    route=route, order=order, name=name, endpoint=backend.url(f'/api/v1/{name}/'))
+            try:
+                self.run(options)
+            finally:
+                route.delete()
+                Template.objects.filter(name=TEMPLATE_NAME).delete()
+
+    def run(self, options):
+        count = options['count']
+        concurrency = options['concurrency']
+        self.stdout.write(
+            f"{count} page views with {options['sources'] + 1} backend requests each,"
+            f" {concurrency} at a time, backend delay {options['delay'] * 1000:.0f} ms")
+        servers = [
+            ('wsgi', get_wsgi_application(), self.run_wsgi),
+            ('asgi', get_asgi_application(), self.run_asgi),
+        ]
+        client = getattr(settings, 'BACKEND_CLIENT', None) or {}
+        modes = [
+            ('sequential', dict(client, MAX_WORKERS=1)),
+            ('concurrent', client),
+        ]
+        for fetch, client_options in modes:
+            with override_settings(API_CACHE={'ENABLED': False}, BACKEND_CLIENT=client_options):
+                for name, application, run in servers:
+                    run(application, f'/{ROUTE_NAME}/', 1, 1)
+                    start = time.perf_counter()
+                    latencies = run(application, f'/{ROUTE_NAME}/', count, concurrency)
+                    elapsed = time.perf_counter() - start
+                    self.stdout.write(
+                        f'  {name} {fetch:<10} {count / elapsed:8.1f} pages/s,'
+                        f' {sum(latencies) / count * 1000:8.1f} ms/page')
+
+    def run_wsgi(self, application, path, count, concurrency):
+        def get(_):
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'SCRIPT_NAME': '',
+                'SERVER_NAME': 'localhost',
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'wsgi.input': io.BytesIO(),
+                'wsgi.url_scheme': 'http',
+            }
+            statuses = []
+            start = time.perf_counter()
+            body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+            assert statuses[0].startswith('200'), (statuses, body)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(get, range(count)))
+
+    def run_asgi(self, application, path, count, concurrency):
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'root_path': '',
+            'query_string': b'',
+            'headers': [(b'host', b'localhost')],
+            'server': ('localhost', 80),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def get(semaphore):
+            async with semaphore:
+                messages = []
+
+                async def send(message):
+                    messages.append(message)
+                start = time.perf_counter()
+                await application(dict(scope), receive, send)
+                assert messages[0]['status'] == 200, messages
+                return time.perf_counter() - start
+
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*[get(semaphore) for _ in range(count)])
+
+        return asyncio.run(main())
@@ -0,0 +1,110 @@
+import random
+import re
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls.resolvers import _route_to_regex
+
+from frontend_site.routes.dispatch import LinearDispatcher
+from frontend_site.routes.models import Route, find_route, route_table
+
+
+def make_routes(count):
+    routes = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            path = f'section{i}/'
+        elif kind == 1:
+            path = f'section{i}/<slug>/'
+        else:
+            path = f'section{i}/<int:pk>/comments/'
+        routes.append(Route(
+            order=i,
+            name=f'route{i}',
+            path=path,
+            endpoint='',
+            template_name='bench.html',
+        ))
+    return routes
+
+
+def make_paths(count, lookups, seed=0):
+    rnd = random.Random(seed)
+    paths = []
+    for _ in range(lookups):
+        i = rnd.randrange(count)
+        kind = i % 3
+        if kind == 0:
+            paths.append(f'section{i}/')
+        elif kind == 1:
+            paths.append(f'section{i}/some-slug/')
+        else:
+            paths.append(f'section{i}/{rnd.randrange(1000)}/comments/')
+    # Misses have to scan every route.
+    paths.append('no/such/page/')
+    return paths
+
+
+def legacy_find_route(path):
+    for route in Route.objects.order_by('order', 'path').all():
+        m = re.match(_route_to_regex(route.path)[0], path)
+        if m is None:
+            continue
+        if path[m.end():] and not route.allow_extra_path:
+            continue
+        return route
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request cost of route lookup.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--routes', type=int, action='append', dest='counts',
+            help='Number of routes (may be given several times; default: 100, 1000 and 10000).',
+        )
+        parser.add_argument(
+            '--lookups', type=int, default=20,
+            help='Number of paths resolved per run.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Number of runs; the best one is reported.',
+        )
+
+    def handle(self, *args, **options):
+        counts = options['counts'] or [100, 1000, 10000]
+        for count in counts:
+            # Work inside a transaction that is always rolled back, so the
+            # benchmark leaves the database untouched.
+            with transaction.atomic():
+                Route.objects.all().delete()
+                Route.objects.bulk_create(make_routes(count))
+                route_table.clear()
+                self.run(count, options['lookups'], options['repeat'])
+                transaction.set_rollback(True)
+            route_table.clear()
+
+    def get_methods(self):
+        linear = LinearDispatcher(route_table.get_routes())
+        return [
+            ('legacy', legacy_find_route),
+            ('linear', linear.match),
+            ('trie', find_route),
+        ]
+
+    def run(self, count, lookups, repeat):
+        paths = make_paths(count, lookups)
+        self.stdout.write(f'{count} routes, {len(paths)} lookups')
+        for name, func in self.get_methods():
+            func(paths[0])  # warm up
+
+            def run_paths():
+                for path in paths:
+                    func(path)
+            best = min(timeit.repeat(run_paths, number=1, repeat=repeat))
+            self.stdout.write(
+                f'  {name:<8} {best / len(paths) * 1e6:12.1f} us/request')
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.10 on 2026-10-17 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0005_add_content_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='cache_timeout',
+            field=models.PositiveIntegerField(blank=True, help_text='Cache rendered pages for anonymous visitors for this many seconds.', null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.0.10 on 2026-10-17 17:27
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0006_add_cache_timeout'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteDataSource',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.IntegerField(null=True)),
+                ('name', models.CharField(help_text='Name of the template variable holding the fetched data.', max_length=100, validators=[django.core.validators.RegexValidator('^[A-Za-z_][A-Za-z0-9_]*\\Z', 'Enter a valid variable name.')])),
+                ('endpoint', models.TextField()),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='data_sources', to='routes.Route')),
+            ],
+            options={
+                'unique_together': {('route', 'name')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.10 on 2026-10-17 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0007_add_data_sources'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='routedatasource',
+            name='fields',
+            field=models.TextField(blank=True, default='*', help_text='Comma-separated fields to request; leave empty for the defaults of the API.'),
+        ),
+        migrations.AddField(
+            model_name='routedatasource',
+            name='params',
+            field=models.TextField(blank=True, default='', help_text='Other query parameters, e.g. "type=blog.BlogPage&order=-first_published_at&limit=5". Values may refer to path parameters as {name}.'),
+        ),
+    ]
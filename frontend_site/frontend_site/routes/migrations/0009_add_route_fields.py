@@ -0,0 +1,23 @@
+# Generated by Django 3.0.10 on 2026-10-17 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0008_add_data_source_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='fields',
+            field=models.TextField(blank=True, default='*', help_text='Comma-separated fields to request; leave empty for the defaults of the API.'),
+        ),
+        migrations.AddField(
+            model_name='route',
+            name='infer_fields',
+            field=models.BooleanField(default=False, help_text='Request only the fields of "data" used by the template, when they can be determined.'),
+        ),
+    ]
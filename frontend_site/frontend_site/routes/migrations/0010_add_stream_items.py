@@ -0,0 +1,18 @@
+# Generated by Django 3.0.10 on 2026-10-17 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0009_add_route_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='stream_items',
+            field=models.BooleanField(default=False, help_text='Decode "data.items" while rendering instead of loading the whole response first. Such responses are not kept in the API cache.'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.10 on 2026-10-17 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0010_add_stream_items'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='stream_response',
+            field=models.BooleanField(default=False, help_text='Send the page while it is being rendered. Such pages are not kept in the page cache.'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.10 on 2026-10-17 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0011_add_stream_response'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='route',
+            name='stream_items',
+            field=models.BooleanField(default=False, help_text='Decode "data.items" while rendering instead of loading the whole response first. Items are decoded again each time they are looped over, and can only be indexed by number, not sliced. Such responses are not kept in the API cache.'),
+        ),
+    ]
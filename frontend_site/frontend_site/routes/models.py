@@ -1,16 +1,59 @@
+import functools
 import re
+import string
+import threading
 import urllib.parse
 
-from django.db import models
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.validators import RegexValidator
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.urls import get_script_prefix
 from django.urls.exceptions import NoReverseMatch
 from django.urls.resolvers import _route_to_regex
+from django.utils.functional import cached_property
 from django.utils.regex_helper import normalize
 from django.utils.http import (
     RFC3986_SUBDELIMS,
     escape_leading_slashes,
 )
 
+from frontend_site.custom_dbtemplates.loader import get_template_data_fields
+from frontend_site.stamps import bump_stamp, get_stamp
+
+from .dispatch import TrieDispatcher
+
+ROUTES_STAMP = 'routes'
+
+
+@functools.lru_cache(maxsize=None)
+def compile_route_path(path):
+    regex, converters = _route_to_regex(path)
+    return re.compile(regex), converters
+
+
+@functools.lru_cache(maxsize=None)
+def reverse_route_path(path):
+    regex, converters = _route_to_regex(path)
+    return normalize(regex), converters
+
+
+def check_placeholders(value, path):
+    """
+    Raise ``ValueError`` unless every ``{name}`` in ``value`` is a parameter
+    of the route ``path``, so that formatting it with the parameters of a
+    match can't fail.
+    """
+    names = compile_route_path(path)[0].groupindex
+    for literal, name, spec, conversion in string.Formatter().parse(value):
+        if name is None:
+            continue
+        if name not in names:
+            raise ValueError('Unknown path parameter {%s}.' % name)
+        if spec or conversion:
+            raise ValueError('Path parameters take no format spec or conversion.')
+
 
 class RouteMatch(object):
     __slots__ = ('route', 'url_params', 'extra_path')
@@ -20,15 +63,53 @@ class RouteMatch(object):
         self.url_params = url_params
         self.extra_path = extra_path
 
-    def build(self, allow_preview=False):
+    def get_fields(self, infer_fields=True):
+        """
+        Return the ``fields`` parameter for the route's endpoint: only the
+        fields used by its template if they are to be and can be inferred,
+        ``Route.fields`` otherwise.
+        """
+        route = self.route
+        if infer_fields and route.infer_fields:
+            fields = get_template_data_fields(route.template_name)
+            if fields is not None:
+                return ','.join(['_'] + fields)
+        return route.fields
+
+    def build(self, allow_preview=False, infer_fields=True):
         endpoint = self.route.endpoint.format(**self.url_params)
-        params = {
-            'fields': '*',
-        }
+        params = {}
+        fields = self.get_fields(infer_fields)
+        if fields:
+            params['fields'] = fields
         if allow_preview:
             params['draft'] = '1'
         return endpoint + self.extra_path, params
 
+    def build_source(self, source, allow_preview=False):
+        endpoint = source.endpoint.format(**self.url_params)
+        # Pairs rather than a dict, as a parameter may be repeated.
+        params = []
+        if source.fields:
+            params.append(('fields', source.fields))
+        for key, value in source.query_params:
+            params.append((key, value.format(**self.url_params)))
+        if allow_preview:
+            params.append(('draft', '1'))
+        return endpoint, params
+
+    def build_all(self, allow_preview=False, infer_fields=True):
+        """
+        Return ``(name, endpoint, params)`` for the route's endpoint (named
+        ``data``) and for each of its data sources.
+        """
+        requests = []
+        if self.route.endpoint:
+            requests.append(('data',) + self.build(allow_preview, infer_fields))
+        for source in self.route.data_sources.all():
+            requests.append((source.name,) + self.build_source(source, allow_preview))
+        return requests
+
 
 class Route(models.Model):
     order = models.IntegerField(null=True)
@@ -38,9 +119,36 @@ class Route(models.Model):
     template_name = models.TextField(null=False, blank=False)
     content_type = models.TextField(null=False, blank=False, default='text/html')
     allow_extra_path = models.BooleanField(null=False, blank=False, default=False)
+    cache_timeout = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text='Cache rendered pages for anonymous visitors for this many seconds.')
+    fields = models.TextField(
+        null=False, blank=True, default='*',
+        help_text='Comma-separated fields to request; leave empty for the defaults of the API.')
+    infer_fields = models.BooleanField(
+        null=False, blank=False, default=False,
+        help_text='Request only the fields of "data" used by the template, when they can be determined.')
+    stream_items = models.BooleanField(
+        null=False, blank=False, default=False,
+        help_text='Decode "data.items" while rendering instead of loading the whole response first.'
+                  ' Items are decoded again each time they are looped over, and can only be indexed by'
+                  ' number, not sliced. Such responses are not kept in the API cache.')
+    stream_response = models.BooleanField(
+        null=False, blank=False, default=False,
+        help_text='Send the page while it is being rendered. Such pages are not kept in the page cache.')
+
+    def clean(self):
+        try:
+            compile_route_path(self.path)
+        except ImproperlyConfigured as e:
+            raise ValidationError({'path': str(e)})
+        try:
+            check_placeholders(self.endpoint, self.path)
+        except ValueError as e:
+            raise ValidationError({'endpoint': str(e)})
 
     def match(self, path):
-        m = re.match(_route_to_regex(self.path)[0], path)
+        m = compile_route_path(self.path)[0].match(path)
         if m is None:
             return None
         extra_path = path[m.end():]
@@ -49,13 +157,127 @@ class Route(models.Model):
         return RouteMatch(self, m.groupdict(), extra_path)
 
 
+class RouteDataSource(models.Model):
+    route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name='data_sources')
+    order = models.IntegerField(null=True)
+    name = models.CharField(
+        max_length=100,
+        validators=[RegexValidator(r'^[A-Za-z_][A-Za-z0-9_]*\Z', 'Enter a valid variable name.')],
+        help_text='Name of the template variable holding the fetched data.')
+    endpoint = models.TextField(null=False, blank=False)
+    fields = models.TextField(
+        null=False, blank=True, default='*',
+        help_text='Comma-separated fields to request; leave empty for the defaults of the API.')
+    params = models.TextField(
+        null=False, blank=True, default='',
+        help_text='Other query parameters, e.g. "type=blog.BlogPage&order=-first_published_at&limit=5".'
+                  ' Values may refer to path parameters as {name}.')
+
+    class Meta:
+        unique_together = [('route', 'name')]
+
+    def clean(self):
+        if self.name == 'data':
+            raise ValidationError({'name': '"data" is reserved for the endpoint of the route.'})
+        if self.params:
+            try:
+                urllib.parse.parse_qsl(self.params, strict_parsing=True)
+            except ValueError:
+                raise ValidationError({'params': 'Enter a valid query string.'})
+        try:
+            compile_route_path(self.route.path)
+        except ImproperlyConfigured:
+            # Reported by the route itself.
+            return
+        errors = {}
+        try:
+            check_placeholders(self.endpoint, self.route.path)
+        except ValueError as e:
+            errors['endpoint'] = str(e)
+        try:
+            for key, value in self.query_params:
+                check_placeholders(value, self.route.path)
+        except ValueError as e:
+            errors['params'] = str(e)
+        if errors:
+            raise ValidationError(errors)
+
+    @cached_property
+    def query_params(self):
+        return urllib.parse.parse_qsl(self.params)
+
+
+class RouteTable(object):
+    """
+    Process-local, ordered list of routes, the dispatcher built on it and
+    an index of routes by name.
+
+    The table is rebuilt lazily whenever the ``routes`` stamp differs from
+    the one it was built against, i.e. after any ``Route`` was saved or
+    deleted in this or another process.
+    """
+
+    def __init__(self, dispatcher_class=TrieDispatcher):
+        self.dispatcher_class = dispatcher_class
+        self._lock = threading.Lock()
+        self._state = None
+
+    def clear(self):
+        with self._lock:
+            self._state = None
+
+    def _get_state(self):
+        stamp = get_stamp(ROUTES_STAMP)
+        state = self._state
+        if state is not None and stamp is not None and stamp == state[0]:
+            return state
+        with self._lock:
+            state = self._state
+            if state is None or stamp is None or stamp != state[0]:
+                routes = self.load_routes()
+                # Names are not unique; the first route in order wins.
+                names = {}
+                for route in routes:
+                    names.setdefault(route.name, route)
+                state = (stamp, routes, self.dispatcher_class(routes), names)
+                self._state = state
+            return state
+
+    def get_routes(self):
+        return self._get_state()[1]
+
+    def get_route(self, name):
+        return self._get_state()[3].get(name)
+
+    def match(self, path):
+        return self._get_state()[2].match(path)
+
+    def load_routes(self):
+        sources = RouteDataSource.objects.order_by('order', 'name')
+        routes = list(
+            Route.objects.order_by('order', 'path')
+            .prefetch_related(models.Prefetch('data_sources', queryset=sources)))
+        for route in routes:
+            compile_route_path(route.path)
+        return routes
+
+
+route_table = RouteTable()
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=RouteDataSource)
+@receiver(post_delete, sender=RouteDataSource)
+def invalidate_routes(sender, **kwargs):
+    # Bump once for this process right away and once more after commit, so
+    # that other processes don't rebuild from uncommitted data.
+    bump_stamp(ROUTES_STAMP)
+    transaction.on_commit(lambda: bump_stamp(ROUTES_STAMP))
+
+
 def find_route(path):
-    for route in Route.objects.order_by('order', 'path').all():
-        m = route.match(path)
-        if m is not None:
-            return m
-    else:
-        return None
+    return route_table.match(path)
 
 
 def reverse_route(route_name, args=None, kwargs=None):
@@ -63,17 +285,16 @@ def reverse_route(route_name, args=None, kwargs=None):
     kwargs = kwargs or {}
     prefix = get_script_prefix()
 
-    try:
-        route = Route.objects.filter(name=route_name).get()
-    except Route.DoesNotExist:
+    route = route_table.get_route(route_name)
+    if route is None:
         msg = (
             "Reverse for '%s' not found." % (route_name)
         )
         raise NoReverseMatch(msg)
 
-    converters = _route_to_regex(route.path)[1]
+    candidates, converters = reverse_route_path(route.path)
 
-    for result, params in normalize(_route_to_regex(route.path)[0]):
+    for result, params in candidates:
         if args:
             if len(args) != len(params):
                 continue
@@ -0,0 +1,204 @@
+"""
+Cache of rendered pages for routes with a ``cache_timeout``.
+
+Pages are stored gzip-compressed in a Django cache and are keyed by the
+request path, the route, the version stamps of routes and backend data and
+the fingerprint of the route's template and the templates it depends on,
+so any change to one of them makes the old entries unreachable. Clients
+that accept gzip get the stored bytes as they are.
+
+Only one worker renders a missing page at a time: threads of the same
+process wait for the first one, and other processes wait for a lock held
+in the shared cache (up to ``WAIT_TIMEOUT`` seconds, after which they
+render the page themselves).
+
+Responses that set cookies or used the CSRF token are not stored, as the
+cached copy would be sent to every visitor without its cookies. Options
+are read from ``settings.PAGE_CACHE``:
+
+``ENABLED``
+    Set to ``False`` to always render pages.
+``CACHE_ALIAS``
+    Django cache holding rendered pages.
+``LOCK_TIMEOUT``
+    Lifetime of the rendering lock, in seconds.
+``WAIT_TIMEOUT``, ``POLL_INTERVAL``
+    How long and how often to look for a page being rendered elsewhere.
+"""
+import gzip
+import hashlib
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from frontend_site.custom_dbtemplates.loader import get_template_fingerprint
+from frontend_site.stamps import get_stamp
+
+from .apicache import BACKEND_DATA_STAMP
+from .models import ROUTES_STAMP
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'LOCK_TIMEOUT': 30,
+    'WAIT_TIMEOUT': 10,
+    'POLL_INTERVAL': 0.05,
+}
+
+re_accepts_gzip = re.compile(r'\bgzip\b')
+
+
+class CachedPage(object):
+    __slots__ = ('content_type', 'compressed')
+
+    def __init__(self, content_type, compressed):
+        self.content_type = content_type
+        self.compressed = compressed
+
+    def __getstate__(self):
+        return (self.content_type, self.compressed)
+
+    def __setstate__(self, state):
+        self.content_type, self.compressed = state
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(response['Content-Type'], compress_string(response.content))
+
+    def to_response(self, request):
+        if re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            response = HttpResponse(self.compressed, content_type=self.content_type)
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(self.compressed), content_type=self.content_type)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class PageCache(object):
+    key_prefix = 'pagecache'
+
+    def __init__(self, options=None):
+        self.options = dict(DEFAULTS, **(options or {}))
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    @property
+    def cache(self):
+        return caches[self.options['CACHE_ALIAS']]
+
+    def is_cacheable(self, request, route):
+        return (
+            self.options['ENABLED']
+            and route.cache_timeout is not None
+            and not route.stream_response
+            and not settings.ALLOW_PREVIEW
+            and request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+        )
+
+    def is_storable(self, request, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+        )
+
+    def make_key(self, request, route):
+        versions = ':'.join([
+            str(get_stamp(ROUTES_STAMP)),
+            str(get_stamp(BACKEND_DATA_STAMP)),
+            get_template_fingerprint(route.template_name),
+        ])
+        source = f'{versions}:{route.pk}:{request.get_full_path()}'
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        return f'{self.key_prefix}:{digest}'
+
+    def get_or_render(self, request, route, render_page):
+        """
+        Return the cached page for ``request``, or call ``render_page()`` to
+        build the response and cache it if it was successful.
+        """
+        key = self.make_key(request, route)
+        page = self.cache.get(key)
+        if page is not None:
+            return page.to_response(request)
+
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+
+        if not leader:
+            event.wait(self.options['WAIT_TIMEOUT'])
+            page = self.cache.get(key)
+            if page is not None:
+                return page.to_response(request)
+            return self.render(render_page)
+
+        try:
+            return self.render_once(request, route, key, render_page)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def render_once(self, request, route, key, render_page):
+        cache = self.cache
+        lock_key = f'{key}:lock'
+        if not cache.add(lock_key, 1, timeout=self.options['LOCK_TIMEOUT']):
+            # Another process is rendering this page.
+            deadline = time.monotonic() + self.options['WAIT_TIMEOUT']
+            while time.monotonic() < deadline:
+                time.sleep(self.options['POLL_INTERVAL'])
+                page = cache.get(key)
+                if page is not None:
+                    return page.to_response(request)
+                if cache.get(lock_key) is None:
+                    break
+            return self.render(render_page)
+        try:
+            response = self.render(render_page)
+            if self.is_storable(request, response):
+                cache.set(key, CachedPage.from_response(response), timeout=route.cache_timeout)
+            patch_vary_headers(response, ('Accept-Encoding',))
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    def render(self, render_page):
+        response = render_page()
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        return response
+
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    global _page_cache
+    if _page_cache is None:
+        with _page_cache_lock:
+            if _page_cache is None:
+                _page_cache = PageCache(getattr(settings, 'PAGE_CACHE', None))
+    return _page_cache
+
+
+@receiver(setting_changed)
+def reset_page_cache(setting, **kwargs):
+    global _page_cache
+    if setting == 'PAGE_CACHE':
+        with _page_cache_lock:
+            _page_cache = None
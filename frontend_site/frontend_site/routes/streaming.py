@@ -0,0 +1,260 @@
+"""
+Render templates piece by piece, for ``StreamingHttpResponse``.
+
+``stream_template()`` walks the compiled template and yields the output of
+each node as soon as it is rendered, instead of joining everything into one
+string. The nodes that contain other nodes and may hold large parts of a
+page (``{% extends %}``, ``{% block %}``, ``{% include %}``, ``{% if %}``,
+``{% with %}`` and ``{% for %}``) are followed the way Django renders them;
+every other node is rendered as a whole.
+
+``{% for %}`` doesn't ask its sequence for a length: ``forloop.last`` is
+known by looking one item ahead, and only ``forloop.revcounter`` and
+``forloop.revcounter0`` read the rest of the sequence when they are used.
+Together with lazily decoded backend data, a loop over thousands of items
+never holds more than one of them.
+"""
+from collections import deque
+
+from django.template import VariableDoesNotExist
+from django.template.base import TextNode
+from django.template.context import make_context
+from django.template.defaulttags import ForNode, IfNode, WithNode
+from django.template.loader_tags import (
+    BLOCK_CONTEXT_KEY,
+    BlockContext,
+    BlockNode,
+    ExtendsNode,
+    IncludeNode,
+)
+
+CHUNK_SIZE = 8192
+
+_END = object()
+
+
+def stream_template(template, context=None, request=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield the output of ``template``, as returned by ``get_template()``, in
+    chunks of about ``chunk_size`` characters.
+    """
+    context = make_context(context, request, autoescape=template.backend.engine.autoescape)
+    return _buffer(_stream_template(template.template, context), chunk_size)
+
+
+def _buffer(pieces, chunk_size):
+    chunk = []
+    size = 0
+    for piece in pieces:
+        if not piece:
+            continue
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _stream_template(template, context):
+    with context.render_context.push_state(template):
+        if context.template is None:
+            with context.bind_template(template):
+                context.template_name = template.name
+                yield from stream_nodelist(template.nodelist, context)
+        else:
+            yield from stream_nodelist(template.nodelist, context)
+
+
+def stream_nodelist(nodelist, context):
+    for node in nodelist:
+        stream = STREAMERS.get(type(node))
+        if stream is None:
+            yield str(node.render_annotated(context))
+        else:
+            yield from stream(node, context)
+
+
+def stream_extends(node, context):
+    # See ExtendsNode.render().
+    compiled_parent = node.get_parent(context)
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(node.blocks)
+    for parent_node in compiled_parent.nodelist:
+        if not isinstance(parent_node, TextNode):
+            if not isinstance(parent_node, ExtendsNode):
+                blocks = {n.name: n for n in compiled_parent.nodelist.get_nodes_by_type(BlockNode)}
+                block_context.add_blocks(blocks)
+            break
+    with context.render_context.push_state(compiled_parent, isolated_context=False):
+        yield from stream_nodelist(compiled_parent.nodelist, context)
+
+
+def stream_block(node, context):
+    # See BlockNode.render().
+    block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+    with context.push():
+        if block_context is None:
+            context['block'] = node
+            yield from stream_nodelist(node.nodelist, context)
+        else:
+            push = block = block_context.pop(node.name)
+            if block is None:
+                block = node
+            block = type(node)(block.name, block.nodelist)
+            block.context = context
+            context['block'] = block
+            yield from stream_nodelist(block.nodelist, context)
+            if push is not None:
+                block_context.push(node.name, push)
+
+
+def stream_include(node, context):
+    # See IncludeNode.render().
+    template = node.template.resolve(context)
+    if not callable(getattr(template, 'render', None)):
+        template_name = template
+        cache = context.render_context.dicts[0].setdefault(node, {})
+        template = cache.get(template_name)
+        if template is None:
+            template = context.template.engine.get_template(template_name)
+            cache[template_name] = template
+    elif hasattr(template, 'template'):
+        template = template.template
+    if not hasattr(template, 'nodelist'):
+        # Not a Django template; render it as a whole.
+        yield str(node.render_annotated(context))
+        return
+    values = {
+        name: var.resolve(context)
+        for name, var in node.extra_context.items()
+    }
+    if node.isolated_context:
+        yield from _stream_template(template, context.new(values))
+    else:
+        with context.push(**values):
+            yield from _stream_template(template, context)
+
+
+def stream_if(node, context):
+    # See IfNode.render().
+    for condition, nodelist in node.conditions_nodelists:
+        if condition is not None:
+            try:
+                match = condition.eval(context)
+            except VariableDoesNotExist:
+                match = None
+        else:
+            match = True
+        if match:
+            yield from stream_nodelist(nodelist, context)
+            return
+
+
+def stream_with(node, context):
+    # See WithNode.render().
+    values = {key: value.resolve(context) for key, value in node.extra_context.items()}
+    with context.push(**values):
+        yield from stream_nodelist(node.nodelist, context)
+
+
+class _LoopVars(dict):
+    """
+    ``forloop`` of a streamed loop, counting the remaining items only when
+    ``revcounter`` is used.
+    """
+
+    def __init__(self, parentloop, remaining):
+        super(_LoopVars, self).__init__(parentloop=parentloop)
+        self._remaining = remaining
+
+    def __missing__(self, key):
+        if key in ('revcounter', 'revcounter0'):
+            # The item after the current one was already taken.
+            count = self._remaining.count() + (0 if self['last'] else 1)
+            return count + 1 if key == 'revcounter' else count
+        raise KeyError(key)
+
+
+class _Remaining(object):
+    """
+    The rest of an iterator, read ahead only when it has to be counted.
+    """
+
+    def __init__(self, iterator):
+        self.iterator = iterator
+        self.ahead = deque()
+
+    def count(self):
+        self.ahead.extend(self.iterator)
+        return len(self.ahead)
+
+    def next(self):
+        if self.ahead:
+            return self.ahead.popleft()
+        return next(self.iterator, _END)
+
+
+def stream_for(node, context):
+    # See ForNode.render().
+    parentloop = context['forloop'] if 'forloop' in context else {}
+    with context.push():
+        values = node.sequence.resolve(context, ignore_failures=True)
+        if values is None:
+            values = []
+        if node.is_reversed:
+            if not hasattr(values, '__reversed__') and not hasattr(values, '__len__'):
+                values = list(values)
+            values = reversed(values)
+        remaining = _Remaining(iter(values))
+        item = remaining.next()
+        if item is _END:
+            yield from stream_nodelist(node.nodelist_empty, context)
+            return
+        num_loopvars = len(node.loopvars)
+        unpack = num_loopvars > 1
+        loop_dict = context['forloop'] = _LoopVars(parentloop, remaining)
+        i = 0
+        while item is not _END:
+            following = remaining.next()
+            loop_dict['counter0'] = i
+            loop_dict['counter'] = i + 1
+            loop_dict['first'] = (i == 0)
+            loop_dict['last'] = following is _END
+
+            pop_context = False
+            if unpack:
+                try:
+                    len_item = len(item)
+                except TypeError:
+                    len_item = 1
+                if num_loopvars != len_item:
+                    raise ValueError(
+                        "Need {} values to unpack in for loop; got {}. "
+                        .format(num_loopvars, len_item),
+                    )
+                context.update(dict(zip(node.loopvars, item)))
+                pop_context = True
+            else:
+                context[node.loopvars[0]] = item
+
+            yield from stream_nodelist(node.nodelist_loop, context)
+
+            if pop_context:
+                context.pop()
+            item = following
+            i += 1
+
+
+STREAMERS = {
+    ExtendsNode: stream_extends,
+    BlockNode: stream_block,
+    IncludeNode: stream_include,
+    IfNode: stream_if,
+    WithNode: stream_with,
+    ForNode: stream_for,
+}
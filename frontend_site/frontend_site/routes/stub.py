@@ -0,0 +1,106 @@
+"""
+A local stand-in for the backend API, used by tests and benchmarks.
+"""
+import json
+import threading
+import time
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+StubRequest = namedtuple('StubRequest', ['path', 'headers'])
+
+
+class StubResponse(object):
+    def __init__(self, data=None, status=200, headers=None, body=None):
+        if body is None:
+            body = json.dumps(data).encode('utf-8')
+        self.status = status
+        self.headers = dict(headers or {})
+        self.headers.setdefault('Content-Type', 'application/json')
+        self.body = body
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super(StubHandler, self).setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            # The handler is reused for the next request on a kept-alive
+            # connection, so record a snapshot.
+            server.requests.append(StubRequest(self.path, self.headers))
+        if server.delay:
+            time.sleep(server.delay)
+        response = server.get_response(self)
+        self.send_response(response.status)
+        for key, value in response.headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(response.body)))
+        self.end_headers()
+        if response.status != 304:
+            self.wfile.write(response.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubBackend(ThreadingHTTPServer):
+    """
+    Serve canned JSON responses on a random local port.
+
+    ``responses`` maps a path to a ``StubResponse`` or to a callable that
+    takes the request handler and returns one.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, responses=None, delay=0):
+        super(StubBackend, self).__init__(('127.0.0.1', 0), StubHandler)
+        self.responses = dict(responses or {})
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = []
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path):
+        return self.base_url + path
+
+    def get_response(self, handler):
+        path = urlsplit(handler.path).path
+        response = self.responses.get(path)
+        if response is None:
+            return StubResponse({'message': 'Not found'}, status=404)
+        if callable(response):
+            return response(handler)
+        return response
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+import requests
+
+from frontend_site.routes.apicache import APICache, fetch_json, get_api_cache
+from frontend_site.routes.stub import StubBackend, StubResponse
+
+
+class APICacheTests(SimpleTestCase):
+    path = '/api/v1/blogs/1'
+
+    def setUp(self):
+        cache.clear()
+        get_api_cache().clear()
+
+    def serve(self, *responses):
+        responses = list(responses)
+
+        def respond(handler):
+            return responses.pop(0)
+        return StubBackend({self.path: respond})
+
+    def test_fresh_hit(self):
+        with self.serve(StubResponse({'id': 1})) as backend:
+            api_cache = APICache()
+            url = backend.url(self.path)
+            self.assertEqual(api_cache.fetch(url, {'fields': '*'}), {'id': 1})
+            self.assertEqual(api_cache.fetch(url, {'fields': '*'}), {'id': 1})
+        self.assertEqual(len(backend.requests), 1)
+
+    def test_params_in_key(self):
+        with self.serve(StubResponse({'v': 1}), StubResponse({'v': 2})) as backend:
+            api_cache = APICache()
+            url = backend.url(self.path)
+            self.assertEqual(api_cache.fetch(url, {'fields': '*'}), {'v': 1})
+            self.assertEqual(api_cache.fetch(url, {'fields': 'title'}), {'v': 2})
+        api_cache = APICache()
+        self.assertEqual(
+            api_cache.make_key(url, [('tag', 'a'), ('fields', '*')]),
+            api_cache.make_key(url, {'tag': 'a', 'fields': '*'}))
+        self.assertNotEqual(
+            api_cache.make_key(url, [('tag', 'a'), ('tag', 'b')]),
+            api_cache.make_key(url, [('tag', 'b'), ('tag', 'a')]))
+
+    def test_shared_tier(self):
+        with self.serve(StubResponse({'id': 1})) as backend:
+            url = backend.url(self.path)
+            APICache().fetch(url)
+            # A new instance stands in for another process.
+            self.assertEqual(APICache().fetch(url), {'id': 1})
+        self.assertEqual(len(backend.requests), 1)
+
+    def test_no_store(self):
+        headers = {'Cache-Control': 'no-store'}
+        with self.serve(StubResponse({'v': 1}, headers=headers),
+                        StubResponse({'v': 2}, headers=headers)) as backend:
+            api_cache = APICache()
+            url = backend.url(self.path)
+            self.assertEqual(api_cache.fetch(url), {'v': 1})
+            self.assertEqual(api_cache.fetch(url), {'v': 2})
+
+    def test_revalidate(self):
+        headers = {'Cache-Control': 'max-age=0', 'ETag': '"v1"'}
+        with self.serve(StubResponse({'v': 1}, headers=headers),
+                        StubResponse(status=304, headers=headers, body=b'')) as backend:
+            api_cache = APICache()
+            url = backend.url(self.path)
+            self.assertEqual(api_cache.fetch(url), {'v': 1})
+            self.assertEqual(api_cache.fetch(url), {'v': 1})
+        self.assertIsNone(backend.requests[0].headers.get('If-None-Match'))
+        self.assertEqual(backend.requests[1].headers.get('If-None-Match'), '"v1"')
+
+    def test_errors_not_cached(self):
+        with self.serve(StubResponse({}, status=404), StubResponse({'id': 1})) as backend:
+            api_cache = APICache()
+            url = backend.url(self.path)
+            with self.assertRaises(requests.HTTPError):
+                api_cache.fetch(url)
+            self.assertEqual(api_cache.fetch(url), {'id': 1})
+
+    def test_lru_bound(self):
+        api_cache = APICache({'MAX_ENTRIES': 2, 'CACHE_ALIAS': None})
+        with StubBackend({
+            '/a': StubResponse({'a': 1}),
+            '/b': StubResponse({'b': 1}),
+            '/c': StubResponse({'c': 1}),
+        }) as backend:
+            for path in ['/a', '/b', '/c', '/a']:
+                api_cache.fetch(backend.url(path))
+        self.assertEqual(len(api_cache.local), 2)
+        self.assertEqual(len(backend.requests), 4)
+
+    def test_preview_bypasses_cache(self):
+        with self.serve(StubResponse({'v': 1}), StubResponse({'v': 2}),
+                        StubResponse({'v': 3})) as backend:
+            url = backend.url(self.path)
+            self.assertEqual(fetch_json(url), {'v': 1})
+            self.assertEqual(fetch_json(url, {'draft': '1'}, allow_preview=True), {'v': 2})
+            self.assertEqual(fetch_json(url, {'draft': '1'}, allow_preview=True), {'v': 3})
+            self.assertEqual(fetch_json(url), {'v': 1})
@@ -0,0 +1,101 @@
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from frontend_site.routes.client import BackendClient, get_client
+from frontend_site.routes.stub import StubBackend, StubResponse
+
+
+class BackendClientTests(SimpleTestCase):
+    def test_session_per_host(self):
+        client = BackendClient()
+        session = client.get_session('http://localhost:18000/api/v1/pages/')
+        self.assertIs(client.get_session('http://localhost:18000/api/v1/blogs/1'), session)
+        self.assertIsNot(client.get_session('http://localhost:18001/api/v1/pages/'), session)
+        self.assertIsNot(client.get_session('https://localhost:18000/api/v1/pages/'), session)
+
+    def test_keep_alive(self):
+        responses = {'/api/v1/pages/': StubResponse({'items': []})}
+        with StubBackend(responses) as backend:
+            client = BackendClient()
+            for _ in range(5):
+                r = client.get(backend.url('/api/v1/pages/'), params={'fields': '*'})
+                self.assertEqual(r.json(), {'items': []})
+            client.close()
+        self.assertEqual(len(backend.requests), 5)
+        self.assertEqual(backend.connections, 1)
+
+    def test_retry(self):
+        statuses = [503, 503, 200]
+
+        def respond(handler):
+            return StubResponse({'status': 'ok'}, status=statuses.pop(0))
+
+        with StubBackend({'/api/v1/pages/': respond}) as backend:
+            client = BackendClient({'BACKOFF_FACTOR': 0})
+            r = client.get(backend.url('/api/v1/pages/'))
+            client.close()
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(backend.requests), 3)
+
+    def test_no_cookies(self):
+        responses = {
+            '/api/v1/pages/': StubResponse({}, headers={'Set-Cookie': 'sessionid=secret; Path=/'}),
+        }
+        with StubBackend(responses) as backend:
+            client = BackendClient()
+            client.get(backend.url('/api/v1/pages/'))
+            client.get(backend.url('/api/v1/pages/'))
+            client.close()
+        self.assertIsNone(backend.requests[1].headers.get('Cookie'))
+
+    def test_settings(self):
+        with override_settings(BACKEND_CLIENT={'TIMEOUT': 1, 'RETRIES': 0}):
+            client = get_client()
+            self.assertEqual(client.options['TIMEOUT'], 1)
+            self.assertEqual(client.options['RETRIES'], 0)
+            self.assertEqual(client.options['POOL_MAXSIZE'], 32)
+        self.assertIsNot(get_client(), client)
+
+    def test_call_many(self):
+        client = BackendClient()
+        self.assertEqual(client.call_many([lambda: 1, lambda: 2, lambda: 3]), [1, 2, 3])
+        client.close()
+
+    def test_call_many_errors(self):
+        done = []
+
+        def fail(error, delay=0):
+            def func():
+                time.sleep(delay)
+                done.append(error)
+                raise error
+            return func
+
+        client = BackendClient()
+        second, third = ValueError('second'), KeyError('third')
+        # The second fails after the third; its error is raised.
+        with self.assertRaises(ValueError) as cm:
+            client.call_many([lambda: 1, fail(second, delay=0.05), fail(third)])
+        self.assertIs(cm.exception, second)
+        self.assertEqual(done, [third, second])
+
+        # Later calls are done when an earlier error is raised.
+        done.clear()
+        with self.assertRaises(ValueError):
+            client.call_many([lambda: 1, fail(second), fail(third, delay=0.05)])
+        self.assertEqual(done, [second, third])
+
+        done.clear()
+        first = RuntimeError('first')
+        with self.assertRaises(RuntimeError) as cm:
+            client.call_many([fail(first), fail(second, delay=0.05), fail(third)])
+        self.assertIs(cm.exception, first)
+        self.assertCountEqual(done, [first, second, third])
+
+        # Without an executor, the first error stops the calls.
+        done.clear()
+        with self.assertRaises(RuntimeError):
+            BackendClient({'MAX_WORKERS': 1}).call_many([fail(first), fail(second)])
+        self.assertEqual(done, [first])
+        client.close()
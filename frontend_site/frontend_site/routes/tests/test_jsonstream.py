@@ -0,0 +1,79 @@
+import json
+
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from frontend_site.routes.jsonstream import JSONStream, LazyObject, open_json_stream
+from frontend_site.routes.stub import StubBackend, StubResponse
+
+DOC = {
+    'meta': {'total_count': 3},
+    'items': [
+        {'id': 1, 'title': 'a "quoted" ] } [ title'},
+        {'id': 22, 'nested': [1, 2, [3]]},
+        {'id': 333, 'body': None},
+    ],
+    'after': 12345,
+    'last': True,
+}
+
+
+class JSONStreamTests(SimpleTestCase):
+    def open(self, size, doc=DOC):
+        text = json.dumps(doc, indent=1)
+        return LazyObject(JSONStream(text[i:i + size] for i in range(0, len(text), size)))
+
+    def test_iterate(self):
+        for size in (1, 3, 7, 4096):
+            with self.subTest(size=size):
+                data = self.open(size)
+                self.assertEqual(data['meta'], {'total_count': 3})
+                self.assertTrue(data['items'])
+                self.assertEqual(list(data['items']), DOC['items'])
+                self.assertEqual(data['after'], 12345)
+                self.assertIs(data['last'], True)
+                self.assertIsNone(data.get('missing'))
+                # Items already read are decoded again.
+                self.assertEqual(list(data['items']), DOC['items'])
+                self.assertEqual(len(data['items']), 3)
+
+    def test_read_ahead(self):
+        for size in (1, 4096):
+            with self.subTest(size=size):
+                data = self.open(size)
+                self.assertIs(data['last'], True)
+                self.assertEqual(len(data['items']), 3)
+                self.assertEqual(data['items'][1]['id'], 22)
+                self.assertEqual(list(data['items']), DOC['items'])
+
+                data = self.open(size)
+                items = iter(data['items'])
+                self.assertEqual(next(items)['id'], 1)
+                self.assertEqual(data['after'], 12345)
+                self.assertEqual([item['id'] for item in items], [22, 333])
+                self.assertEqual([item['id'] for item in data['items']], [1, 22, 333])
+
+                data = self.open(size)
+                self.assertEqual([item['id'] for item in reversed(data['items'])], [333, 22, 1])
+
+    def test_empty(self):
+        data = self.open(2, {'items': [], 'meta': {}})
+        self.assertFalse(data['items'])
+        self.assertEqual(len(data['items']), 0)
+        self.assertEqual(data['meta'], {})
+        self.assertIsNone(self.open(1, {}).get('items'))
+
+    def test_template(self):
+        template = Template(
+            '{{ data.meta.total_count }}:{% for item in data.items %}{{ item.id }}{% if not forloop.last %},{% endif %}'
+            '{% endfor %}:{{ data.items.0.id }}:{{ data.items|length }}:'
+            '{% for item in data.items %}{{ item.id }}{% endfor %}')
+        self.assertEqual(template.render(Context({'data': self.open(5)})), '3:1,22,333:1:3:122333')
+
+    def test_open_json_stream(self):
+        body = json.dumps(DOC).encode('utf-8')
+        with StubBackend({'/api/v1/pages/': StubResponse(body=body), '/api/v1/list': StubResponse([1, 2])}) as backend:
+            data = open_json_stream(backend.url('/api/v1/pages/'))
+            self.assertEqual(list(data['items']), DOC['items'])
+            data._close()
+            self.assertEqual(open_json_stream(backend.url('/api/v1/list')), [1, 2])
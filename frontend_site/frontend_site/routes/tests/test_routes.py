@@ -0,0 +1,217 @@
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase
+from django.urls import NoReverseMatch
+
+from frontend_site.routes.dispatch import LinearDispatcher, TrieDispatcher, literal_segments
+from frontend_site.routes.models import Route, RouteDataSource, find_route, reverse_route, route_table
+
+
+class FindRouteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        route_table.clear()
+
+    def create_route(self, **kwargs):
+        kwargs.setdefault('template_name', 'test.html')
+        return Route.objects.create(**kwargs)
+
+    def test_match(self):
+        self.create_route(order=20, name='blog_index', path='blog/')
+        self.create_route(order=10, name='blog_detail', path='blog/<blog_id>')
+        m = find_route('blog/1')
+        self.assertEqual(m.route.name, 'blog_detail')
+        self.assertEqual(m.url_params, {'blog_id': '1'})
+        self.assertEqual(m.extra_path, '')
+        m = find_route('blog/')
+        self.assertEqual(m.route.name, 'blog_index')
+        self.assertIsNone(find_route('about/'))
+
+    def test_order(self):
+        self.create_route(order=20, name='second', path='<slug>/')
+        self.create_route(order=10, name='first', path='about/')
+        self.assertEqual(find_route('about/').route.name, 'first')
+        self.assertEqual(find_route('contact/').route.name, 'second')
+
+    def test_extra_path(self):
+        self.create_route(order=10, name='strict', path='docs/')
+        self.assertIsNone(find_route('docs/a/b'))
+        self.create_route(order=20, name='loose', path='docs/', allow_extra_path=True)
+        m = find_route('docs/a/b')
+        self.assertEqual(m.route.name, 'loose')
+        self.assertEqual(m.extra_path, 'a/b')
+
+    def test_cached(self):
+        self.create_route(order=10, name='blog_index', path='blog/')
+        find_route('blog/')
+        with self.assertNumQueries(0):
+            self.assertEqual(find_route('blog/').route.name, 'blog_index')
+
+    def test_invalidate_on_save(self):
+        route = self.create_route(order=10, name='blog_index', path='blog/')
+        self.assertIsNotNone(find_route('blog/'))
+        route.path = 'posts/'
+        route.save()
+        self.assertIsNone(find_route('blog/'))
+        self.assertEqual(find_route('posts/').route.name, 'blog_index')
+
+    def test_invalidate_on_delete(self):
+        route = self.create_route(order=10, name='blog_index', path='blog/')
+        self.assertIsNotNone(find_route('blog/'))
+        route.delete()
+        self.assertIsNone(find_route('blog/'))
+
+
+class RouteDataSourceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        route_table.clear()
+
+    def test_build(self):
+        route = Route.objects.create(
+            order=10, name='blog_detail', path='blog/<blog_id>',
+            endpoint='/api/v1/pages/{blog_id}', template_name='test.html')
+        RouteDataSource.objects.create(
+            route=route, order=1, name='recent', endpoint='/api/v1/pages/',
+            fields='title,first_published_at', params='type=blog.BlogPage&child_of={blog_id}&limit=5')
+        RouteDataSource.objects.create(
+            route=route, order=2, name='tags', endpoint='/api/v1/tags/', fields='')
+        m = find_route('blog/1')
+        self.assertEqual(m.build_all(), [
+            ('data', '/api/v1/pages/1', {'fields': '*'}),
+            ('recent', '/api/v1/pages/', [
+                ('fields', 'title,first_published_at'), ('type', 'blog.BlogPage'), ('child_of', '1'), ('limit', '5')]),
+            ('tags', '/api/v1/tags/', []),
+        ])
+        self.assertEqual(m.build_all(allow_preview=True)[2], ('tags', '/api/v1/tags/', [('draft', '1')]))
+
+    def test_repeated_params(self):
+        route = Route.objects.create(order=10, name='tag', path='tags/<tag>', template_name='test.html')
+        RouteDataSource.objects.create(
+            route=route, name='posts', endpoint='/api/v1/pages/', fields='', params='tag={tag}&tag=news')
+        self.assertEqual(
+            find_route('tags/django').build_all()[0],
+            ('posts', '/api/v1/pages/', [('tag', 'django'), ('tag', 'news')]))
+
+    def test_clean(self):
+        route = Route(name='blog_detail', template_name='test.html')
+        with self.assertRaises(ValidationError):
+            RouteDataSource(route=route, name='data', endpoint='/api/v1/pages/').clean()
+        with self.assertRaises(ValidationError):
+            RouteDataSource(route=route, name='recent', endpoint='/api/v1/pages/', params='limit').clean()
+        with self.assertRaises(ValidationError):
+            RouteDataSource(route=route, name='not-valid', endpoint='/api/v1/pages/').full_clean()
+
+    def test_clean_placeholders(self):
+        route = Route(name='blog_detail', path='blog/<int:blog_id>/', template_name='test.html')
+        route.endpoint = '/api/v1/pages/{blog_id}/'
+        route.clean()
+        RouteDataSource(
+            route=route, name='recent', endpoint='/api/v1/pages/{blog_id}/', params='child_of={blog_id}').clean()
+        for endpoint, params in [
+                ('/api/v1/pages/{id}/', ''),
+                ('/api/v1/pages/', 'child_of={}'),
+                ('/api/v1/pages/', 'child_of={blog_id'),
+                ('/api/v1/pages/', 'child_of={blog_id:d}'),
+                ('/api/v1/pages/', 'search={0[1]}')]:
+            with self.assertRaises(ValidationError):
+                RouteDataSource(route=route, name='recent', endpoint=endpoint, params=params).clean()
+        route.endpoint = '/api/v1/pages/{slug}/'
+        with self.assertRaises(ValidationError):
+            route.clean()
+
+
+class ReverseRouteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        route_table.clear()
+        Route.objects.create(
+            order=10, name='blog_detail', path='blog/<int:blog_id>/',
+            template_name='blog_page.html')
+        Route.objects.create(
+            order=20, name='blog_index', path='blog/',
+            template_name='blog_index.html')
+
+    def test_reverse(self):
+        self.assertEqual(reverse_route('blog_index'), '/blog/')
+        self.assertEqual(reverse_route('blog_detail', args=[1]), '/blog/1/')
+        self.assertEqual(reverse_route('blog_detail', kwargs={'blog_id': 2}), '/blog/2/')
+
+    def test_no_reverse_match(self):
+        with self.assertRaises(NoReverseMatch):
+            reverse_route('missing')
+        with self.assertRaises(NoReverseMatch):
+            reverse_route('blog_detail')
+
+    def test_invalidate_on_save(self):
+        self.assertEqual(reverse_route('blog_index'), '/blog/')
+        route = Route.objects.get(name='blog_index')
+        route.path = 'posts/'
+        route.save()
+        self.assertEqual(reverse_route('blog_index'), '/posts/')
+
+    def test_route_url_tag(self):
+        template = Template(
+            '{% load routes %}'
+            '{% for id in ids %}{% route_url "blog_detail" id %} {% endfor %}'
+            '{% route_url "blog_index" %}'
+        )
+        context = Context({'ids': range(50)})
+        template.render(context)
+        with self.assertNumQueries(0):
+            output = template.render(context)
+        self.assertTrue(output.startswith('/blog/0/ /blog/1/ '))
+        self.assertTrue(output.endswith('/blog/49/ /blog/'))
+
+
+class DispatcherTests(SimpleTestCase):
+    paths = [
+        'blog/',
+        'blog/<slug>/',
+        'blog/archive-<int:year>/',
+        'blog/tags/',
+        'blog/tags/<tag>/',
+        '<slug>/',
+        'about/',
+        'about',
+        'docs/',
+        '',
+    ]
+
+    def make_routes(self):
+        routes = []
+        for order, path in enumerate(self.paths):
+            routes.append(Route(
+                order=order, name=f'route{order}', path=path,
+                allow_extra_path=path in ('docs/', ''),
+            ))
+        return routes
+
+    def test_literal_segments(self):
+        self.assertEqual(literal_segments(''), [])
+        self.assertEqual(literal_segments('about'), [])
+        self.assertEqual(literal_segments('blog/'), ['blog'])
+        self.assertEqual(literal_segments('blog/<slug>/'), ['blog'])
+        self.assertEqual(literal_segments('blog/archive-<int:year>/'), ['blog'])
+        self.assertEqual(literal_segments('blog/tags/<tag>/'), ['blog', 'tags'])
+
+    def test_same_as_linear(self):
+        routes = self.make_routes()
+        # Reversing the order changes which route wins for most paths.
+        for routes in (routes, routes[::-1]):
+            linear = LinearDispatcher(routes)
+            trie = TrieDispatcher(routes)
+            for path in [
+                '', 'blog/', 'blog/hello/', 'blog/archive-2020/', 'blog/tags/',
+                'blog/tags/python/', 'blog/tags/python/extra', 'about/', 'about',
+                'aboutx', 'docs/', 'docs/a/b', 'other/', 'x/y/z',
+            ]:
+                expected = linear.match(path)
+                actual = trie.match(path)
+                if expected is None:
+                    self.assertIsNone(actual, path)
+                    continue
+                self.assertIs(actual.route, expected.route, path)
+                self.assertEqual(actual.url_params, expected.url_params)
+                self.assertEqual(actual.extra_path, expected.extra_path)
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.test import TestCase
+
+from frontend_site.custom_dbtemplates.models import Template
+from frontend_site.routes.streaming import stream_template
+
+TEMPLATES = {
+    'base.html': (
+        '<title>{% block title %}Base{% endblock %}</title>'
+        '{% block content %}{% endblock %}'
+        '{% block footer %}footer{% endblock %}'
+    ),
+    'layout.html': (
+        '{% extends "base.html" %}'
+        '{% block title %}{{ block.super }} | Layout{% endblock %}'
+        '{% block content %}<main>{% block main %}{% endblock %}</main>{% endblock %}'
+    ),
+    'item.html': '<li>{{ item.title|upper }} {{ extra }}</li>',
+    'feed.html': (
+        '{% extends "layout.html" %}'
+        '{% block title %}{{ block.super }} | Feed{% endblock %}'
+        '{% block main %}'
+        '{% if not items %}no items{% elif items|length > 100 %}many{% else %}'
+        '<ul>{% for item in items %}'
+        '{% include "item.html" with extra=forloop.counter %}'
+        '{{ forloop.first }}{{ forloop.last }}{{ forloop.revcounter }}{{ forloop.revcounter0 }}'
+        '{% for tag in item.tags reversed %}[{{ forloop.parentloop.counter0 }}{{ tag }}]{% empty %}-{% endfor %}'
+        '{% endfor %}</ul>'
+        '{% for key, value in pairs %}{{ key }}={{ value }};{% endfor %}'
+        '{% with first=items.0 %}{{ first.title }}{% endwith %}'
+        '{% include "item.html" with item=items.1 only %}'
+        '{% endif %}'
+        '{% endblock %}'
+    ),
+}
+
+
+class StreamTemplateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for name, content in TEMPLATES.items():
+            Template.objects.create(name=name, content=content, published=True)
+
+    def render(self, context, chunk_size=1):
+        template = get_template('feed.html')
+        chunks = list(stream_template(template, context, chunk_size=chunk_size))
+        self.assertEqual(''.join(chunks), template.render(context))
+        return chunks
+
+    def test_same_output(self):
+        items = [{'title': f'item {i}', 'tags': ['a', 'b'][:i]} for i in range(3)]
+        chunks = self.render({'items': items, 'pairs': [('a', 1), ('b', 2)]})
+        self.assertGreater(len(chunks), 10)
+        self.render({'items': []})
+        self.render({'items': items * 50})
+
+    def test_lazy_sequence(self):
+        def items():
+            for i in range(3):
+                yield {'title': f'item {i}', 'tags': []}
+        template = get_template('feed.html')
+        output = ''.join(stream_template(template, {'items': items(), 'pairs': []}))
+        self.assertIn('<li>ITEM 0 1</li>TrueFalse32-', output)
+        self.assertIn('<li>ITEM 2 3</li>FalseTrue10-', output)
+
+    def test_chunk_size(self):
+        items = [{'title': 'x' * 1000}] * 20
+        chunks = self.render({'items': items}, chunk_size=4096)
+        self.assertTrue(all(len(chunk) >= 4096 for chunk in chunks[:-1]))
@@ -0,0 +1,283 @@
+import gzip
+import json
+import threading
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from frontend_site.custom_dbtemplates.models import Template
+from frontend_site.routes.apicache import get_api_cache
+from frontend_site.routes.models import Route, RouteDataSource, route_table
+from frontend_site.routes.pagecache import PageCache
+from frontend_site.routes.stub import StubBackend, StubResponse
+
+
+@override_settings(INVALIDATION_TOKEN='secret')
+class InvalidateViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_api_cache().clear()
+
+    def post(self, events, token='secret'):
+        return self.client.post(
+            '/_invalidate/',
+            data=json.dumps({'events': events}),
+            content_type='application/json',
+            HTTP_X_INVALIDATION_TOKEN=token,
+        )
+
+    def test_forbidden(self):
+        self.assertEqual(self.post([], token='wrong').status_code, 403)
+        with override_settings(INVALIDATION_TOKEN=''):
+            self.assertEqual(self.post([], token='').status_code, 403)
+
+    def test_bad_request(self):
+        for data in ['{}', '[]', 'nope', '{"events": 5}', '{"events": ["x"]}', '{"events": [null]}']:
+            response = self.client.post(
+                '/_invalidate/', data=data, content_type='application/json',
+                HTTP_X_INVALIDATION_TOKEN='secret')
+            self.assertEqual(response.status_code, 400, data)
+
+    def test_invalidate(self):
+        versions = [StubResponse({'v': 1}), StubResponse({'v': 2})]
+        with StubBackend({'/api/v1/blogs/1': lambda handler: versions.pop(0)}) as backend:
+            api_cache = get_api_cache()
+            url = backend.url('/api/v1/blogs/1')
+            self.assertEqual(api_cache.fetch(url), {'v': 1})
+
+            response = self.post([{'event': 'revision_saved', 'page_id': 1, 'draft': True}])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(api_cache.fetch(url), {'v': 1})
+
+            response = self.post([{'event': 'page_published', 'page_id': 1, 'draft': False}])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(api_cache.fetch(url), {'v': 2})
+
+
+class PageViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_api_cache().clear()
+        route_table.clear()
+        self.backend = StubBackend({
+            '/api/v1/blogs/1': StubResponse({'id': 1, 'title': 'Hello'}),
+        }).start()
+        self.addCleanup(self.backend.stop)
+        Template.objects.create(
+            name='blog_page.html', content='<h1>{{ data.title }}</h1>', published=True)
+
+    def create_route(self, **kwargs):
+        return Route.objects.create(
+            order=10, name='blog_detail', path='blog/<blog_id>',
+            endpoint=self.backend.url('/api/v1/blogs/{blog_id}'),
+            template_name='blog_page.html', **kwargs)
+
+    def test_page(self):
+        self.create_route()
+        response = self.client.get('/blog/1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'<h1>Hello</h1>')
+        # Routes, templates and backend data are all cached by now.
+        with self.assertNumQueries(0):
+            self.client.get('/blog/1')
+        self.assertEqual(self.client.get('/blog/2').status_code, 404)
+        self.assertEqual(self.client.get('/other/').status_code, 404)
+
+    def create_data_sources(self, route):
+        for order, name in enumerate(['recent', 'tags']):
+            RouteDataSource.objects.create(
+                route=route, order=order, name=name, endpoint=self.backend.url(f'/api/v1/{name}/'))
+        Template.objects.filter(name='blog_page.html').update(
+            content='<h1>{{ data.title }}</h1>{{ recent.title }} {{ tags.title }}')
+
+    def test_data_sources(self):
+        self.create_data_sources(self.create_route())
+        # Each response waits until all three requests are in flight.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def respond(data):
+            def handler(request):
+                barrier.wait()
+                return StubResponse(data)
+            return handler
+
+        self.backend.responses.update({
+            '/api/v1/blogs/1': respond({'title': 'Hello'}),
+            '/api/v1/recent/': respond({'title': 'Recent'}),
+            '/api/v1/tags/': respond({'title': 'Tags'}),
+        })
+        response = self.client.get('/blog/1')
+        self.assertEqual(response.content, b'<h1>Hello</h1>Recent Tags')
+        with self.assertNumQueries(0):
+            self.client.get('/blog/1')
+
+    @override_settings(BACKEND_CLIENT={'MAX_WORKERS': 1})
+    def test_data_sources_sequential(self):
+        self.create_data_sources(self.create_route())
+        self.backend.responses.update({
+            '/api/v1/recent/': StubResponse({'title': 'Recent'}),
+            '/api/v1/tags/': StubResponse({'title': 'Tags'}),
+        })
+        response = self.client.get('/blog/1')
+        self.assertEqual(response.content, b'<h1>Hello</h1>Recent Tags')
+        self.assertEqual(self.client.get('/blog/2').status_code, 404)
+
+    def test_infer_fields(self):
+        self.create_route(infer_fields=True)
+        self.assertEqual(self.client.get('/blog/1').content, b'<h1>Hello</h1>')
+        self.assertIn('fields=_%2Ctitle', self.backend.requests[0].path)
+
+    def test_infer_fields_rejected(self):
+        self.create_route(infer_fields=True)
+
+        def respond(request):
+            if 'fields=_' in request.path:
+                return StubResponse({'message': 'unknown fields: title'}, status=400)
+            return StubResponse({'title': 'Hello'})
+
+        self.backend.responses['/api/v1/blogs/1'] = respond
+        with self.assertLogs('frontend_site.routes.views', 'WARNING'):
+            response = self.client.get('/blog/1')
+        self.assertEqual(response.content, b'<h1>Hello</h1>')
+        self.assertIn('fields=%2A', self.backend.requests[1].path)
+
+    def test_stream_items(self):
+        Template.objects.create(
+            name='blog_index.html', published=True,
+            content='{{ data.meta.total_count }}{% for page in data.items %} {{ page.title }}{% endfor %}')
+        Route.objects.create(
+            order=10, name='blog_index', path='blog/', endpoint=self.backend.url('/api/v1/blogs/'),
+            template_name='blog_index.html', stream_items=True)
+        self.backend.responses['/api/v1/blogs/'] = StubResponse({
+            'meta': {'total_count': 2},
+            'items': [{'id': 1, 'title': 'Hello'}, {'id': 2, 'title': 'World'}],
+        })
+        self.assertEqual(self.client.get('/blog/').content, b'2 Hello World')
+        # The connection was released and is reused.
+        self.assertEqual(self.client.get('/blog/').content, b'2 Hello World')
+        self.assertEqual(self.backend.connections, 1)
+
+    def test_stream_response(self):
+        Template.objects.create(
+            name='feed.xml', published=True,
+            content='<feed>{% for page in data.items %}<entry>{{ page.title }}</entry>{% endfor %}</feed>')
+        Route.objects.create(
+            order=10, name='feed', path='feed/', endpoint=self.backend.url('/api/v1/blogs/'),
+            template_name='feed.xml', content_type='application/atom+xml',
+            stream_items=True, stream_response=True, cache_timeout=60)
+        self.backend.responses['/api/v1/blogs/'] = StubResponse({
+            'items': [{'id': 1, 'title': 'Hello'}, {'id': 2, 'title': 'World'}],
+        })
+        for _ in range(2):
+            response = self.client.get('/feed/')
+            self.assertTrue(response.streaming)
+            self.assertEqual(response['Content-Type'], 'application/atom+xml')
+            self.assertEqual(
+                b''.join(response.streaming_content), b'<feed><entry>Hello</entry><entry>World</entry></feed>')
+            response.close()
+        self.assertEqual(len(self.backend.requests), 2)
+        self.assertEqual(self.backend.connections, 1)
+
+    def test_page_cache(self):
+        self.create_route(cache_timeout=60)
+        self.assertEqual(self.client.get('/blog/1').content, b'<h1>Hello</h1>')
+        with self.assertNumQueries(0):
+            response = self.client.get('/blog/1')
+        self.assertEqual(response.content, b'<h1>Hello</h1>')
+        self.assertEqual(len(self.backend.requests), 1)
+
+        response = self.client.get('/blog/1', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), b'<h1>Hello</h1>')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    @override_settings(API_CACHE={'ENABLED': False})
+    def test_page_cache_no_timeout(self):
+        self.create_route()
+        self.client.get('/blog/1')
+        self.client.get('/blog/1')
+        self.assertEqual(len(self.backend.requests), 2)
+
+    @override_settings(API_CACHE={'ENABLED': False}, PAGE_CACHE={'ENABLED': False})
+    def test_page_cache_disabled(self):
+        self.create_route(cache_timeout=60)
+        self.client.get('/blog/1')
+        self.client.get('/blog/1')
+        self.assertEqual(len(self.backend.requests), 2)
+
+    @override_settings(API_CACHE={'ENABLED': False})
+    def test_page_cache_csrf(self):
+        template = Template.objects.get(name='blog_page.html')
+        template.content = '<form>{% csrf_token %}</form>'
+        template.save()
+        self.create_route(cache_timeout=60)
+        for _ in range(2):
+            response = self.client.get('/blog/1')
+            self.assertIn('csrftoken', response.cookies)
+        self.assertEqual(len(self.backend.requests), 2)
+
+    def test_page_cache_template_changed(self):
+        self.create_route(cache_timeout=60)
+        self.client.get('/blog/1')
+        template = Template.objects.get(name='blog_page.html')
+        template.content = '<h2>{{ data.title }}</h2>'
+        template.save()
+        self.assertEqual(self.client.get('/blog/1').content, b'<h2>Hello</h2>')
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_single_flight(self):
+        page_cache = PageCache()
+        route = Route(pk=1, cache_timeout=60)
+        calls = []
+
+        def render_page():
+            calls.append(1)
+            time.sleep(0.2)
+            return HttpResponse(b'page')
+
+        # Load the template versions before other threads need them.
+        page_cache.make_key(RequestFactory().get('/blog/1'), route)
+        responses = []
+
+        def get():
+            request = RequestFactory().get('/blog/1')
+            responses.append(page_cache.get_or_render(request, route, render_page))
+
+        threads = [threading.Thread(target=get) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r.content for r in responses], [b'page'] * 5)
+
+    def test_lock_held_elsewhere(self):
+        page_cache = PageCache({'WAIT_TIMEOUT': 0.2})
+        route = Route(pk=1, cache_timeout=60)
+        request = RequestFactory().get('/blog/1')
+        key = page_cache.make_key(request, route)
+        cache.add(f'{key}:lock', 1)
+        response = page_cache.get_or_render(request, route, lambda: HttpResponse(b'page'))
+        self.assertEqual(response.content, b'page')
+
+    def test_cookies_not_stored(self):
+        page_cache = PageCache()
+        route = Route(pk=1, cache_timeout=60)
+        calls = []
+
+        def render_page():
+            calls.append(1)
+            response = HttpResponse(b'page')
+            response.set_cookie('visitor', str(len(calls)))
+            return response
+
+        for _ in range(2):
+            response = page_cache.get_or_render(RequestFactory().get('/blog/1'), route, render_page)
+            self.assertEqual(response.cookies['visitor'].value, str(len(calls)))
+        self.assertEqual(len(calls), 2)
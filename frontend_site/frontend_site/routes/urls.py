@@ -1,8 +1,9 @@
-from django.urls import re_path
+from django.urls import path, re_path
 
 from . import views
 
 
 urlpatterns = [
+    path('_invalidate/', views.invalidate_view, name='routes_invalidate'),
     re_path('^(?P<path>.*)$', views.page_view, name='routes_page'),
 ]
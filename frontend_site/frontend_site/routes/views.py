@@ -1,11 +1,33 @@
+import functools
+import json
+import logging
+
 from django.conf import settings
-from django.http import Http404, HttpResponsePermanentRedirect
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponsePermanentRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.template.loader import get_template
 from django.template.response import TemplateResponse
+from django.utils.crypto import constant_time_compare
 from django.utils.http import escape_leading_slashes
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 import requests
 
+from .apicache import fetch_json, invalidate_backend_data
+from .client import get_client
+from .jsonstream import LazyObject, open_json_stream
 from .models import find_route
+from .pagecache import get_page_cache
+from .streaming import stream_template
+
+logger = logging.getLogger(__name__)
 
 
 def page_view(request, path):
@@ -19,21 +41,95 @@ def page_view(request, path):
                 return HttpResponsePermanentRedirect(new_path)
         raise Http404
 
-    data = None
-    if m.route.endpoint:
-        endpoint, params = m.build(allow_preview=settings.ALLOW_PREVIEW)
-        r = requests.get(endpoint, params=params)
-        if r.status_code == 404:
-            raise Http404
-        r.raise_for_status()
-        data = r.json()
+    page_cache = get_page_cache()
+    if page_cache.is_cacheable(request, m.route):
+        return page_cache.get_or_render(request, m.route, lambda: render_page(request, m))
+    return render_page(request, m)
+
 
+def fetch_context(m, infer_fields=True):
+    allow_preview = settings.ALLOW_PREVIEW
+    streams = []
+
+    def fetch(name, endpoint, params):
+        if name == 'data' and m.route.stream_items:
+            stream = open_json_stream(endpoint, params)
+            streams.append(stream)
+            return stream
+        return fetch_json(endpoint, params, allow_preview=allow_preview)
+
+    sources = m.build_all(allow_preview=allow_preview, infer_fields=infer_fields)
+    try:
+        results = get_client().call_many([functools.partial(fetch, *source) for source in sources])
+    except BaseException:
+        for stream in streams:
+            if isinstance(stream, LazyObject):
+                stream._close()
+        raise
     context = {
-        'data': data,
+        'data': None,
     }
-    return TemplateResponse(
+    for (name, endpoint, params), result in zip(sources, results):
+        context[name] = result
+    return context
+
+
+def render_page(request, m):
+    try:
+        try:
+            context = fetch_context(m)
+        except requests.HTTPError as e:
+            # The API rejects unknown fields; a template may use names that
+            # aren't fields of the page.
+            if e.response.status_code != 400 or not m.route.infer_fields:
+                raise
+            logger.warning(
+                'Inferred fields rejected for route %r: %s', m.route.name, e.response.text[:200])
+            context = fetch_context(m, infer_fields=False)
+    except requests.HTTPError as e:
+        if e.response.status_code == 404:
+            raise Http404
+        raise
+
+    streams = [value for value in context.values() if isinstance(value, LazyObject)]
+    if m.route.stream_response:
+        return StreamingHttpResponse(
+            stream_page(get_template(m.route.template_name), context, request, streams),
+            content_type=m.route.content_type,
+        )
+
+    response = TemplateResponse(
         request,
         m.route.template_name,
         context=context,
         content_type=m.route.content_type,
     )
+    for stream in streams:
+        # Release the backend connection once the page is rendered.
+        response.add_post_render_callback(lambda response, stream=stream: stream._close())
+    return response
+
+
+def stream_page(template, context, request, streams):
+    try:
+        yield from stream_template(template, context, request)
+    finally:
+        for stream in streams:
+            stream._close()
+
+
+@csrf_exempt
+@require_POST
+def invalidate_view(request):
+    token = settings.INVALIDATION_TOKEN
+    if not token or not constant_time_compare(
+            request.headers.get('X-Invalidation-Token', ''), token):
+        return HttpResponseForbidden()
+    try:
+        events = json.loads(request.body)['events']
+    except (ValueError, KeyError, TypeError):
+        return HttpResponseBadRequest()
+    if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+        return HttpResponseBadRequest()
+    invalidate_backend_data(events)
+    return JsonResponse({'status': 'ok'})
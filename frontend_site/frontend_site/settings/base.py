@@ -73,7 +73,7 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
             ],
             'loaders': [
-                'frontend_site.custom_dbtemplates.loader.Loader',
+                'frontend_site.custom_dbtemplates.loader.CachedLoader',
                 'django.template.loaders.app_directories.Loader',
                 'django.template.loaders.filesystem.Loader',
             ],
@@ -139,6 +139,58 @@ FIXTURE_DIRS = [
 
 ALLOW_PREVIEW = os.environ.get('ALLOW_PREVIEW', '') != ''
 
+# Caches. Version stamps (see frontend_site.stamps) must be seen by every
+# process serving the site, the preview server included, so they are kept
+# in a cache shared through the file system rather than in process memory.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'stamps': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.stamps'),
+    },
+}
+
+STAMPS_CACHE_ALIAS = 'stamps'
+
+# Backend API client (see frontend_site.routes.client)
+
+BACKEND_CLIENT = {
+    'TIMEOUT': (3.05, 30),
+    'RETRIES': 2,
+    'BACKOFF_FACTOR': 0.1,
+    'POOL_MAXSIZE': 32,
+    'POOL_BLOCK': False,
+    'MAX_WORKERS': 32,
+}
+
+# Cache of backend API responses (see frontend_site.routes.apicache)
+
+API_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 60,
+    'STALE_TIMEOUT': 3600,
+    'MAX_ENTRIES': 1000,
+    'CACHE_ALIAS': 'default',
+}
+
+# Cache of rendered pages (see frontend_site.routes.pagecache)
+
+PAGE_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'LOCK_TIMEOUT': 30,
+    'WAIT_TIMEOUT': 10,
+    'POLL_INTERVAL': 0.05,
+}
+
+# Shared secret for change notifications sent by the backend
+# (see frontend_site.routes.views.invalidate_view)
+
+INVALIDATION_TOKEN = os.environ.get('INVALIDATION_TOKEN', '')
+
 SITE_ID = 1
 
 # JSRENDER_ESCAPE_FUNCTION = 'html_escape'
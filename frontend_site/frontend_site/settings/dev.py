@@ -11,6 +11,8 @@ ALLOWED_HOSTS = ['*']
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+INVALIDATION_TOKEN = 'changeme'
+
 
 try:
     from .local import *  # NOQA: F401, F403
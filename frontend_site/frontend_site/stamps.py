@@ -0,0 +1,38 @@
+"""
+Version stamps shared between worker processes.
+
+A stamp is an opaque token stored in the Django cache named by
+``settings.STAMPS_CACHE_ALIAS``. Process-local caches remember the stamp
+they were built against and rebuild themselves when it changes. That cache
+has to be shared by all processes (file system, memcached, redis,
+database, ...); a local-memory cache only invalidates within a single
+process.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _get_cache():
+    return caches[getattr(settings, 'STAMPS_CACHE_ALIAS', 'default')]
+
+
+def _make_key(name):
+    return f'stamps:{name}'
+
+
+def get_stamp(name):
+    cache = _get_cache()
+    key = _make_key(name)
+    stamp = cache.get(key)
+    if stamp is None:
+        # Lost or never set: agree on a fresh token so that every process
+        # rebuilds at least once.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        stamp = cache.get(key)
+    return stamp
+
+
+def bump_stamp(name):
+    _get_cache().set(_make_key(name), uuid.uuid4().hex, timeout=None)